@@ -0,0 +1,331 @@
+import math
+import random
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from engine import MIN_MOVES_TO_WIN
+from resolver import resolve_cascade
+from topology import GRID, get_topology
+from transposition import TranspositionTable
+from board import ZOBRIST_SIDE
+
+WIN_SCORE = 1000000
+MAX_CASCADE_WAVES = 1000  # Safety cap for cascades explored during search
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time or node budget runs out"""
+
+
+def legal_moves(board, player):
+    """Return (row, col) moves for player: empty cells and cells they own"""
+    owner = board.owner
+    return [tuple(move) for move in np.argwhere((owner == 0) | (owner == player + 1)).tolist()]
+
+
+def legal_cells(board, player):
+    """Return player's legal moves as an array of flat cell indices (cheaper than legal_moves on big boards)"""
+    owner = board.owner
+    return np.flatnonzero((owner == 0) | (owner == player + 1))
+
+
+def random_move(board, player, rng, tries=16):
+    """Return a uniformly random legal (row, col) for player.
+
+    Samples cells until one is legal, which on most positions takes a try
+    or two, and only falls back to listing every legal cell when the
+    player is boxed in.
+    """
+    owner = board.owner
+    rows, cols = owner.shape
+    for _ in range(tries):
+        row, col = rng.randrange(rows), rng.randrange(cols)
+        if owner[row, col] == 0 or owner[row, col] == player + 1:
+            return row, col
+    return divmod(int(rng.choice(legal_cells(board, player))), cols)
+
+
+def play_move(board, player, row, col, topology, transpositions=None):
+    """Return a new board with player's move played and its cascade resolved.
+
+    Boards are small int8 arrays, so copy-make (and dropping the copy to
+    unmake) is the cheapest make/unmake available. Resolved cascades are
+    cached in ``transpositions`` when given.
+    """
+    key = None
+    if transpositions is not None:
+        key = (board.zobrist ^ (ZOBRIST_SIDE if player else 0), row, col)
+        cached = transpositions.get(key)
+        if cached is not None:
+            return cached
+
+    child = board.copy()
+    if child.add_orb(row, col, player + 1) >= topology.critical[row, col]:
+        resolve_cascade(child, player + 1, topology, max_waves=MAX_CASCADE_WAVES, start=[row * topology.cols + col])
+        if key is not None:
+            transpositions.put(key, child)
+    return child
+
+
+def has_won(board, player, moves_made):
+    """Return True if player has eliminated the other player"""
+    return (moves_made >= MIN_MOVES_TO_WIN and board.cells[2 - player] == 0
+            and board.cells[player + 1] > 0)
+
+
+def evaluate(board, player):
+    """Static evaluation from player's point of view: orb and cell advantage"""
+    me, other = player + 1, 2 - player
+    return int(board.orbs[me] - board.orbs[other]) + int(board.cells[me] - board.cells[other])
+
+
+class SearchPlayer:
+    """Base for search bots: a per-move time limit and an optional node budget"""
+
+    def __init__(self, time_limit=1.0, max_nodes=None, seed=None):
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.rng = random.Random(seed)
+        self.transpositions = TranspositionTable(50000)
+        self.nodes = 0
+        self.deadline = 0
+
+    def think_time(self, seconds_left):
+        """Seconds to spend on a move given the player's remaining clock"""
+        if seconds_left is None:
+            return self.time_limit
+        return max(0.05, min(self.time_limit, seconds_left / 10))
+
+    def check_budget(self):
+        """Count a node and stop the search once over budget.
+
+        The clock is read on every call: a node costs O(rows * cols) on big
+        boards, so checking only every few nodes overshoots the deadline.
+        """
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SearchTimeout()
+        if time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+    def choose_move(self, board, player, moves_made, seconds_left=None, topology=GRID):
+        """Return the (row, col) to play on a board of the named topology; board is not modified"""
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.think_time(seconds_left)
+        topology = get_topology(*board.shape, topology)
+        moves = legal_moves(board, player)
+        if len(moves) == 1:
+            return moves[0]
+        return self.search(board, player, moves_made, moves, topology)
+
+    def search(self, board, player, moves_made, moves, topology):
+        raise NotImplementedError
+
+
+class RandomPlayer(SearchPlayer):
+    """Plays a uniformly random legal move"""
+
+    def search(self, board, player, moves_made, moves, topology):
+        return self.rng.choice(moves)
+
+
+class GreedyPlayer(SearchPlayer):
+    """One-ply search: plays the move with the best immediate evaluation"""
+
+    def search(self, board, player, moves_made, moves, topology):
+        self.rng.shuffle(moves)
+        best_move, best_score = moves[0], -math.inf
+        for row, col in moves:
+            child = play_move(board, player, row, col, topology, self.transpositions)
+            if has_won(child, player, moves_made + 1):
+                return row, col
+            score = evaluate(child, player)
+            if score > best_score:
+                best_move, best_score = (row, col), score
+        return best_move
+
+
+class MinimaxPlayer(SearchPlayer):
+    """Negamax with alpha-beta pruning and iterative deepening"""
+
+    def __init__(self, time_limit=1.0, max_nodes=None, max_depth=6, seed=None):
+        super().__init__(time_limit, max_nodes, seed)
+        self.max_depth = max_depth
+
+    def search(self, board, player, moves_made, moves, topology):
+        self.rng.shuffle(moves)
+        best_move = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self.root(board, player, moves_made, moves, topology, depth)
+            except SearchTimeout:
+                break
+            best_move = move
+            if abs(score) >= WIN_SCORE:
+                break  # Forced result found, deeper search won't change it
+            # Search the best move first on the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+        return best_move
+
+    def root(self, board, player, moves_made, moves, topology, depth):
+        alpha, beta = -math.inf, math.inf
+        best_move = moves[0]
+        for row, col in moves:
+            child = play_move(board, player, row, col, topology, self.transpositions)
+            score = -self.negamax(child, 1 - player, moves_made + 1, depth - 1, -beta, -alpha, topology)
+            if score > alpha:
+                alpha, best_move = score, (row, col)
+        return alpha, best_move
+
+    def negamax(self, board, player, moves_made, depth, alpha, beta, topology):
+        """Score board for player (to move), who is searched depth plies deep"""
+        self.check_budget()
+        if has_won(board, 1 - player, moves_made):
+            return -WIN_SCORE - depth  # Prefer quicker wins and slower losses
+        if depth == 0:
+            return evaluate(board, player)
+
+        for row, col in legal_moves(board, player):
+            child = play_move(board, player, row, col, topology, self.transpositions)
+            score = -self.negamax(child, 1 - player, moves_made + 1, depth - 1, -beta, -alpha, topology)
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+
+class MCTSNode:
+    __slots__ = ("board", "player", "moves_made", "parent", "move", "children",
+                 "untried", "untried_count", "visits", "reward", "winner")
+
+    def __init__(self, board, player, moves_made, parent=None, move=None):
+        self.board = board
+        self.player = player  # Player to move at this node
+        self.moves_made = moves_made
+        self.parent = parent
+        self.move = move
+        self.children = []
+        self.visits = 0
+        self.reward = 0.0  # From the point of view of the player who moved into this node
+        self.winner = 1 - player if has_won(board, 1 - player, moves_made) else None
+        # Flat indices of unexpanded moves; the first untried_count entries are still to try
+        self.untried = None if self.winner is not None else legal_cells(board, player)
+        self.untried_count = 0 if self.untried is None else len(self.untried)
+
+
+class MCTSPlayer(SearchPlayer):
+    """UCT Monte Carlo tree search with short random rollouts"""
+
+    def __init__(self, time_limit=1.0, max_nodes=None, rollout_depth=8, exploration=1.4, seed=None):
+        super().__init__(time_limit, max_nodes, seed)
+        self.rollout_depth = rollout_depth
+        self.exploration = exploration
+
+    def search(self, board, player, moves_made, moves, topology):
+        root = MCTSNode(board, player, moves_made)
+        try:
+            while True:
+                self.check_budget()
+                node = self.select(root)
+                if node.untried_count:
+                    node = self.expand(node, topology)
+                self.backpropagate(node, self.rollout(node, topology))
+        except SearchTimeout:
+            pass
+        if not root.children:
+            return self.rng.choice(moves)
+        return max(root.children, key=lambda child: child.visits).move
+
+    def select(self, node):
+        while not node.untried_count and node.children:
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.reward / child.visits +
+                       self.exploration * math.sqrt(log_visits / child.visits))
+        return node
+
+    def expand(self, node, topology):
+        # Swap a random untried move to the end of the live part and drop it from there
+        untried, last = node.untried, node.untried_count - 1
+        index = self.rng.randrange(node.untried_count)
+        untried[index], untried[last] = untried[last], untried[index]
+        node.untried_count = last
+        row, col = divmod(int(untried[last]), topology.cols)
+        board = play_move(node.board, node.player, row, col, topology, self.transpositions)
+        child = MCTSNode(board, 1 - node.player, node.moves_made + 1, node, (row, col))
+        node.children.append(child)
+        return child
+
+    def rollout(self, node, topology):
+        """Play random moves from node; returns the reward for the player who moved into it"""
+        mover = 1 - node.player
+        if node.winner is not None:
+            return 1.0 if node.winner == mover else 0.0
+
+        board, player, moves_made = node.board, node.player, node.moves_made
+        for _ in range(self.rollout_depth):
+            if time.perf_counter() >= self.deadline:
+                raise SearchTimeout()
+            row, col = random_move(board, player, self.rng)
+            board = play_move(board, player, row, col, topology)
+            moves_made += 1
+            if has_won(board, player, moves_made):
+                return 1.0 if player == mover else 0.0
+            player = 1 - player
+
+        # Squash the static evaluation into a win probability
+        return 1.0 / (1.0 + math.exp(-evaluate(board, mover) / 4))
+
+    def backpropagate(self, node, reward):
+        while node is not None:
+            node.visits += 1
+            node.reward += reward
+            reward = 1.0 - reward
+            node = node.parent
+
+
+PLAYERS = {"random": RandomPlayer, "greedy": GreedyPlayer, "minimax": MinimaxPlayer, "mcts": MCTSPlayer}
+
+
+_worker_player = None  # The bot living in an AIWorker process, with its warm caches
+
+
+def _init_worker(player):
+    global _worker_player
+    _worker_player = player
+
+
+def _choose_in_worker(board, player, moves_made, seconds_left, topology):
+    return _worker_player.choose_move(board, player, moves_made, seconds_left, topology)
+
+
+class AIWorker:
+    """Runs a bot's choose_move in a background process so the game loop never waits on it"""
+
+    def __init__(self, player):
+        self.player = player
+        self.executor = ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(player,))
+        self.pending = None
+
+    def request_move(self, board, player, moves_made, seconds_left=None, topology=GRID):
+        """Start thinking about a move unless already doing so"""
+        if self.pending is None:
+            self.pending = self.executor.submit(_choose_in_worker, board, player, moves_made, seconds_left, topology)
+
+    def poll(self):
+        """Return the chosen (row, col) once ready, otherwise None"""
+        if self.pending is None or not self.pending.done():
+            return None
+        move = self.pending.result()
+        self.pending = None
+        return move
+
+    def cancel(self):
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
+
+    def shutdown(self, wait=False):
+        """Stop the worker process; with wait, block until a running search finishes"""
+        self.cancel()
+        self.executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,137 @@
+import numpy as np
+from engine import MIN_MOVES_TO_WIN
+from topology import GRID, board_shape, get_topology
+
+
+class BatchEnv:
+    """Steps many headless games at once as (batch, rows, cols) owner/count arrays.
+
+    Follows the engine's instant-mode rules: each step plays one move per
+    game, then resolves every game's cascade together in vectorized waves,
+    masking out games whose cascade has settled or whose opponent has been
+    wiped out. Games that hit ``max_waves`` in one cascade end as draws with
+    ``exhausted`` set. Finished games ignore their action until reset.
+
+    Players are 0 and 1, owners on the board are player + 1, and ``winner``
+    is -1 while a game is running or when it ended in a draw.
+
+    ``grid_size`` and ``topology`` select the board as in the engine: a
+    side length or (rows, cols) pair, and "grid", "torus" or "hex".
+    """
+
+    def __init__(self, batch_size, grid_size=8, max_waves=10000, topology=GRID):
+        self.batch_size = batch_size
+        self.grid_size = grid_size
+        self.max_waves = max_waves
+        rows, cols = board_shape(grid_size)
+        self.topology = get_topology(rows, cols, topology)
+        self.critical = self.topology.critical
+        shape = (batch_size, rows, cols)
+        self.owner = np.zeros(shape, dtype=np.int8)
+        self.count = np.zeros(shape, dtype=np.int8)
+        self.current_player = np.zeros(batch_size, dtype=np.int8)
+        self.move_count = np.zeros(batch_size, dtype=np.int32)
+        self.done = np.zeros(batch_size, dtype=bool)
+        self.winner = np.full(batch_size, -1, dtype=np.int8)
+        self.exhausted = np.zeros(batch_size, dtype=bool)
+        self.waves = np.zeros(batch_size, dtype=np.int32)  # Waves in each game's last cascade
+
+    def observation(self):
+        """Return a (batch, 2, rows, cols) int8 copy of the owner and count planes"""
+        return np.stack([self.owner, self.count], axis=1)
+
+    def reset(self, games=None):
+        """Start new games (all of them, or those selected by index or mask); returns the observation"""
+        if games is None:
+            games = slice(None)
+        self.owner[games] = 0
+        self.count[games] = 0
+        self.current_player[games] = 0
+        self.move_count[games] = 0
+        self.done[games] = False
+        self.winner[games] = -1
+        self.exhausted[games] = False
+        self.waves[games] = 0
+        return self.observation()
+
+    def legal_moves(self):
+        """Return a (batch, rows, cols) bool mask of legal moves; all False for finished games"""
+        mover = (self.current_player + 1)[:, None, None]
+        legal = (self.owner == 0) | (self.owner == mover)
+        legal &= ~self.done[:, None, None]
+        return legal
+
+    def step(self, actions):
+        """Play one move per game and resolve all cascades.
+
+        ``actions`` holds a flat cell index (row * cols + col) per game; entries
+        for finished games are ignored. Returns ``(observation, reward,
+        done, info)`` where reward is +1 for a player who just won and 0
+        otherwise.
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        playing = ~self.done
+        games = np.flatnonzero(playing)
+        if ((actions[games] < 0) | (actions[games] >= self.topology.cells)).any():
+            raise ValueError("action out of range")
+        rows, cols = np.divmod(actions[games], self.topology.cols)
+        mover = (self.current_player + 1).astype(np.int8)
+        cell_owner = self.owner[games, rows, cols]
+        if ((cell_owner != 0) & (cell_owner != mover[games])).any():
+            raise ValueError("illegal move: cell is owned by the other player")
+
+        self.owner[games, rows, cols] = mover[games]
+        self.count[games, rows, cols] += 1
+        self.move_count[games] += 1
+
+        self.resolve(playing, mover)
+
+        # Winner: the mover, once the opponent has no cells left
+        opponent = (3 - mover)[:, None, None]
+        opponent_cells = (self.owner == opponent).any(axis=(1, 2))
+        won = playing & (self.move_count >= MIN_MOVES_TO_WIN) & ~opponent_cells
+        self.winner[won] = self.current_player[won]
+        # A cascade that ran out of budget leaves critical cells behind: a draw unless already won
+        self.done |= won | (playing & self.exhausted)
+
+        # Hand the turn over; a player with no legal move loses
+        switch = playing & ~self.done
+        self.current_player[switch] = 1 - self.current_player[switch]
+        stuck = switch & ~self.legal_moves().any(axis=(1, 2))
+        self.current_player[stuck] = 1 - self.current_player[stuck]
+        self.winner[stuck] = self.current_player[stuck]
+        self.done |= stuck
+
+        reward = (won | stuck).astype(np.float32)
+        info = {"waves": self.waves.copy(), "exhausted": self.exhausted.copy()}
+        return self.observation(), reward, self.done.copy(), info
+
+    def resolve(self, playing, mover):
+        """Run cascade waves for all playing games until every one has settled"""
+        self.waves[playing] = 0
+        self.exhausted[playing] = False
+        active = playing.copy()
+        # Only stop on elimination in games where the opponent had cells to lose
+        opponent = (3 - mover)[:, None, None]
+        had_opponent = (self.owner == opponent).any(axis=(1, 2))
+        while True:
+            exploding = (self.count >= self.critical) & active[:, None, None]
+            cascading = exploding.any(axis=(1, 2))
+            active &= cascading
+            if not active.any():
+                return
+
+            budget_left = self.waves < self.max_waves
+            self.exhausted |= active & ~budget_left
+            active &= budget_left
+            exploding &= active[:, None, None]
+
+            self.count[exploding] = 0
+            self.owner[exploding] = 0
+            hits = self.topology.hits(exploding)
+            self.count += hits
+            np.copyto(self.owner, np.broadcast_to(mover[:, None, None], self.owner.shape), where=hits > 0)
+            self.waves[active] += 1
+
+            eliminated = had_opponent & ~(self.owner == opponent).any(axis=(1, 2))
+            active &= ~eliminated
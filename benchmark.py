@@ -0,0 +1,268 @@
+"""Benchmarks for the rules, cascades, particles and rendering, with fixed seeds.
+
+    python benchmark.py --out before.json
+    python benchmark.py --out after.json --compare before.json
+    python benchmark.py --filter cascade/full --min-time 1
+
+Every benchmark runs until it has used --min-time seconds (and at least
+three runs), then reports per-run timings in microseconds. Results are
+written as JSON, so two versions can be compared with --compare.
+Rendering runs offscreen through SDL's dummy video driver.
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+from board import Board
+from engine import ChainReactionEngine, EngineState
+from particles import ParticlePool
+from topology import get_topology
+
+SEED = 1234
+CASCADE_SIZES = (8, 32, 128)
+SCAN_SIZES = (8, 32, 128, 512)
+DRAW_SIZES = (8, 32, 128)
+PARTICLE_COUNTS = (1000, 4000, 20000)
+
+
+def measure(run, setup=None, min_time=0.3, min_runs=3, max_runs=10000):
+    """Time run() repeatedly (calling setup() untimed before each run); returns stats in microseconds"""
+    times = []
+    info = None
+    total = 0.0
+    while len(times) < min_runs or (total < min_time and len(times) < max_runs):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        info = run()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+    times.sort()
+    result = {"runs": len(times),
+              "median_us": round(statistics.median(times) * 1e6, 2),
+              "min_us": round(times[0] * 1e6, 2),
+              "mean_us": round(statistics.fmean(times) * 1e6, 2),
+              "p90_us": round(times[int(0.9 * (len(times) - 1))] * 1e6, 2)}
+    if isinstance(info, dict):
+        result.update(info)
+    return result
+
+
+def random_position(grid_size, seed, fill=0.9):
+    """A seeded board with most cells occupied one orb short of exploding or less"""
+    rng = np.random.default_rng(seed)
+    critical = get_topology(grid_size).critical
+    occupied = rng.random((grid_size, grid_size)) < fill
+    owner = (rng.integers(1, 3, (grid_size, grid_size)) * occupied).astype(np.int8)
+    count = (rng.integers(1, critical) * occupied).astype(np.int8)
+    return owner, count
+
+
+def full_position(grid_size):
+    """Worst case: player 1 owns every cell, each one orb short of exploding"""
+    critical = get_topology(grid_size).critical
+    return np.ones((grid_size, grid_size), dtype=np.int8), (critical - 1).astype(np.int8)
+
+
+def trigger_cell(owner, count):
+    """The cell nearest the center that player 1 can make explode, made to exist if needed"""
+    n = owner.shape[0]
+    critical = get_topology(n).critical
+    rows, cols = np.nonzero((owner == 1) & (count == critical - 1))
+    if len(rows) == 0:
+        owner[n // 2, n // 2] = 1
+        count[n // 2, n // 2] = critical[n // 2, n // 2] - 1
+        return n // 2, n // 2
+    nearest = np.argmin((rows - n // 2) ** 2 + (cols - n // 2) ** 2)
+    return int(rows[nearest]), int(cols[nearest])
+
+
+def cascade_benchmark(owner, count, instant, min_time, max_waves=None, max_explosions=None):
+    """Time make_move plus the whole chain reaction it sets off, from a fixed position"""
+    n = owner.shape[0]
+    row, col = trigger_cell(owner, count)
+    engine = ChainReactionEngine(n, clock=lambda: 0, instant=instant,
+                                 max_waves=max_waves, max_explosions=max_explosions)
+    state = EngineState(Board(n, owner, count), 0, (60, 60), (5, 5), 10, False, None, False)
+
+    def setup():
+        engine.restore(state)
+
+    def run():
+        engine.make_move(row, col)
+        engine.process_explosions()
+
+    result = measure(run, setup, min_time)
+    if instant:
+        result["waves"] = len(engine.last_cascade)
+        result["explosions"] = int(sum(len(wave.exploded) for wave in engine.last_cascade))
+    else:
+        result["explosions"] = engine.cascade_explosions
+    result["exhausted"] = engine.cascade_exhausted
+    return result
+
+
+def bench_cascades(min_time):
+    results = {}
+    for n in CASCADE_SIZES:
+        owner, count = random_position(n, SEED + n)
+        for mode, instant in (("queued", False), ("instant", True)):
+            results[f"cascade/random/{mode}/{n}"] = cascade_benchmark(owner, count, instant, min_time)
+        # A board owned by one side never settles, so the cascade runs until its budget is spent
+        owner, count = full_position(n)
+        results[f"cascade/full/queued/{n}"] = cascade_benchmark(owner, count, False, min_time,
+                                                                max_explosions=4 * n * n)
+        results[f"cascade/full/instant/{n}"] = cascade_benchmark(owner, count, True, min_time, max_waves=4 * n)
+    return results
+
+
+def bench_scans(min_time):
+    """check_winner and switch_player after a move, on boards of every size"""
+    results = {}
+    for n in SCAN_SIZES:
+        owner, count = random_position(n, SEED + n)
+        engine = ChainReactionEngine(n, clock=lambda: 0)
+        engine.restore(EngineState(Board(n, owner, count), 0, (60, 60), (5, 5), 10, False, None, False))
+
+        def run(engine=engine):
+            for _ in range(100):
+                engine.check_winner()
+                engine.switch_player()
+            return {"calls_per_run": 100}
+
+        results[f"scan/check_winner+switch_player/{n}"] = measure(run, None, min_time)
+    return results
+
+
+def bench_particles(min_time):
+    """One update step of a full particle pool"""
+    results = {}
+    for size in PARTICLE_COUNTS:
+        pool = ParticlePool(size, seed=SEED)
+        rng = np.random.default_rng(SEED)
+
+        def setup(pool=pool, rng=rng):
+            # Top the pool back up so every timed step moves a full pool
+            while pool.emit(float(rng.uniform(0, 900)), float(rng.uniform(0, 700)), 0, 256):
+                pass
+
+        result = measure(pool.update, setup, min_time)
+        result["particles_per_s"] = round(size / (result["median_us"] / 1e6))
+        results[f"particles/update/{size}"] = result
+    return results
+
+
+def bench_draw(min_time):
+    """Per-frame draw cost of the pygame view, offscreen"""
+    import view
+
+    results = {}
+    for n in DRAW_SIZES:
+        game = view.ChainReactionGame(grid_size=n)
+        owner, count = random_position(n, SEED + n)
+        game.engine.board = Board(n, owner, count)
+
+        def full(game=game):
+            game.full_redraw = True
+            game.draw()
+
+        def idle(game=game):
+            game.draw()
+
+        def setup_particles(game=game):
+            if len(game.particles) < 1000:
+                game.particles.emit(300, 380, 0, 2000)
+
+        def particles(game=game):
+            game.particles.update()
+            game.draw()
+
+        for zoom in ("fit", "close"):
+            game.camera.fit()
+            if zoom == "close":
+                game.zoom(100)
+            game.camera_moved(zoomed=True)
+            cell_size = {"cell_size": game.camera.cell_size}
+            results[f"draw/full/{zoom}/{n}"] = dict(measure(full, None, min_time), **cell_size)
+            game.draw()
+            results[f"draw/idle/{zoom}/{n}"] = dict(measure(idle, None, min_time), **cell_size)
+            results[f"draw/particles/{zoom}/{n}"] = dict(measure(particles, setup_particles, min_time), **cell_size)
+            game.particles.clear()
+            game.full_redraw = True
+    return results
+
+
+BENCHMARKS = {"cascade": bench_cascades, "scan": bench_scans, "particles": bench_particles, "draw": bench_draw}
+
+
+def environment():
+    """Versions and machine details stored with the results"""
+    import pygame
+
+    info = {"python": platform.python_version(), "numpy": np.__version__, "pygame": pygame.version.ver,
+            "machine": platform.machine(), "platform": platform.platform(), "seed": SEED}
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        if commit.returncode == 0:
+            info["commit"] = commit.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return info
+
+
+def compare(results, baseline):
+    """Return printable lines with each benchmark's median against a baseline run"""
+    lines = [f"{'benchmark':48} {'baseline':>12} {'now':>12} {'ratio':>8}"]
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        ratio = result["median_us"] / old["median_us"] if old["median_us"] else float("inf")
+        lines.append(f"{name:48} {old['median_us']:>10.1f}us {result['median_us']:>10.1f}us {ratio:>7.2f}x")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths with fixed seeds.")
+    parser.add_argument("--filter", help="only run benchmarks whose name starts with this, e.g. cascade/full")
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds to spend per benchmark")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    results = {}
+    prefix = args.filter or ""
+    for group, bench in BENCHMARKS.items():
+        if not (prefix.startswith(group) or group.startswith(prefix)):
+            continue
+        for name, result in bench(args.min_time).items():
+            if not name.startswith(prefix):
+                continue
+            results[name] = result
+            print(f"{name:48} {result['median_us']:>12.1f}us median  ({result['runs']} runs)", flush=True)
+
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump({"environment": environment(), "results": results}, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        print()
+        for line in compare(results, baseline):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+import numpy as np
+from functools import lru_cache
+from topology import board_shape
+
+ZOBRIST_SEED = 0x5A17  # Fixed so position hashes agree across processes and runs
+ZOBRIST_COUNTS = 8  # Settled cells hold at most 5 orbs; higher counts (only seen mid-cascade) share a key
+ZOBRIST_SIDE = int(np.random.default_rng(ZOBRIST_SEED).integers(0, 2**64, dtype=np.uint64))  # Player 2 to move
+
+
+@lru_cache(maxsize=8)
+def zobrist_keys(shape):
+    """Return the random uint64 key table for a board shape, indexed [flat cell, owner - 1, count].
+
+    Empty cells have no key (they hash as zero), so an empty board hashes to 0.
+    """
+    rng = np.random.default_rng([ZOBRIST_SEED, *shape])
+    keys = rng.integers(0, 2**64, size=(shape[0] * shape[1], 2, ZOBRIST_COUNTS), dtype=np.uint64)
+    keys.flags.writeable = False
+    return keys
+
+
+class Board:
+    """Compact board state: cell owner and orb count as two int8 arrays.
+
+    An owner of 0 means the cell is empty, otherwise it is player + 1.
+    Boards compare and hash by value, and copying one is a few array copies,
+    so they can be stored in sets, dicts and search trees.
+
+    ``cells[i]`` and ``orbs[i]`` are running totals of the cells owned by
+    (and orbs held by) owner i, with ``cells[0]`` counting empty cells.
+    They are kept up to date by every mutating method, so always go through
+    those rather than writing to ``owner``/``count`` directly. The same
+    goes for ``zobrist``, an incrementally updated 64-bit hash of the
+    position that also serves as the board's ``__hash__``.
+    """
+
+    __slots__ = ("owner", "count", "cells", "orbs", "zobrist", "keys")
+
+    def __init__(self, grid_size=8, owner=None, count=None):
+        if owner is None:
+            owner = np.zeros(board_shape(grid_size), dtype=np.int8)
+        if count is None:
+            count = np.zeros(owner.shape, dtype=np.int8)
+        # Contiguous, so the flat views the bulk updates write through share memory with the planes
+        self.owner = np.ascontiguousarray(owner)
+        self.count = np.ascontiguousarray(count)
+        self.keys = zobrist_keys(owner.shape)
+        self.recount()
+
+    def __getstate__(self):
+        # The key table is shared per shape and can be large, so pickles leave it out
+        return self.owner, self.count, self.cells, self.orbs, self.zobrist
+
+    def __setstate__(self, state):
+        self.owner, self.count, self.cells, self.orbs, self.zobrist = state
+        self.keys = zobrist_keys(self.owner.shape)
+
+    @property
+    def shape(self):
+        return self.owner.shape
+
+    def copy(self):
+        """Return an independent copy of this board"""
+        board = Board.__new__(Board)
+        board.owner = self.owner.copy()
+        board.count = self.count.copy()
+        board.cells = self.cells.copy()
+        board.orbs = self.orbs.copy()
+        board.zobrist = self.zobrist
+        board.keys = self.keys
+        return board
+
+    def recount(self):
+        """Rebuild the per-owner totals and the Zobrist hash with a full scan"""
+        owners = self.owner.ravel()
+        self.cells = np.bincount(owners, minlength=3).astype(np.int64)
+        self.orbs = np.bincount(owners, weights=self.count.ravel(), minlength=3).astype(np.int64)
+        self.zobrist = self.cell_keys(np.arange(owners.size), owners, self.count.ravel())
+
+    def cell_key(self, row, col, owner, count):
+        """Return the Zobrist key of one cell holding count orbs of owner (0 when empty)"""
+        if owner == 0:
+            return 0
+        return int(self.keys[row * self.owner.shape[1] + col, owner - 1, min(count, ZOBRIST_COUNTS - 1)])
+
+    def cell_keys(self, cells, owners, counts):
+        """Return the XOR of the Zobrist keys of the cells at flat indices holding owners and counts.
+
+        A cell may appear more than once (its keys then cancel out), so the
+        keys of a cell's old and new values can be folded into one call.
+        """
+        occupied = owners != 0
+        keys = self.keys[cells[occupied], owners[occupied] - 1, np.minimum(counts[occupied], ZOBRIST_COUNTS - 1)]
+        return int(np.bitwise_xor.reduce(keys, initial=np.uint64(0)))
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return (self.owner.shape == other.owner.shape and
+                np.array_equal(self.owner, other.owner) and
+                np.array_equal(self.count, other.count))
+
+    def __hash__(self):
+        return self.zobrist
+
+    def cell(self, row, col):
+        """Return (owner, count) for a cell"""
+        return int(self.owner[row, col]), int(self.count[row, col])
+
+    def add_orb(self, row, col, owner):
+        """Add one orb to a cell, capturing it for owner; returns the new count"""
+        previous, count = self.cell(row, col)
+        self.zobrist ^= self.cell_key(row, col, previous, count) ^ self.cell_key(row, col, owner, count + 1)
+        if previous != owner:
+            self.cells[previous] -= 1
+            self.cells[owner] += 1
+            self.orbs[previous] -= count
+            self.orbs[owner] += count
+            self.owner[row, col] = owner
+        self.orbs[owner] += 1
+        self.count[row, col] = count + 1
+        return count + 1
+
+    def clear_cell(self, row, col):
+        """Empty a cell"""
+        previous, count = self.cell(row, col)
+        self.zobrist ^= self.cell_key(row, col, previous, count)
+        self.cells[previous] -= 1
+        self.cells[0] += 1
+        self.orbs[previous] -= count
+        self.owner[row, col] = 0
+        self.count[row, col] = 0
+
+    def changed_cells(self, other):
+        """Return the flat indices of the cells that differ from another board of the same shape"""
+        return np.flatnonzero((self.owner != other.owner) | (self.count != other.count))
+
+    def set_cells(self, cells, owners, counts):
+        """Overwrite the cells at sorted flat indices with owners and counts.
+
+        Returns the owners and counts that were replaced, so a diff can be
+        applied and reverted (see changed_cells).
+        """
+        owners = np.asarray(owners, dtype=np.int8)
+        counts = np.asarray(counts, dtype=np.int8)
+        owner, count = self.owner.reshape(-1), self.count.reshape(-1)
+        previous_owners, previous_counts = owner[cells], count[cells]
+        owner[cells] = owners
+        count[cells] = counts
+        self.cells += np.bincount(owners, minlength=3) - np.bincount(previous_owners, minlength=3)
+        self.orbs += (np.bincount(owners, weights=counts, minlength=3) -
+                      np.bincount(previous_owners, weights=previous_counts, minlength=3)).astype(np.int64)
+        self.zobrist ^= self.cell_keys(np.concatenate([cells, cells]), np.concatenate([previous_owners, owners]),
+                                       np.concatenate([previous_counts, counts]))
+        return previous_owners, previous_counts
+
+    def explode(self, cells, targets, hits, owner):
+        """Empty the cells at sorted flat indices, then add hits[i] orbs to targets[i], capturing it for owner.
+
+        Returns the counts that exploded, and the targets' owners and counts
+        between the two steps (so a target that exploded itself reads as
+        empty). The hash is updated in one pass over the changed cells.
+        """
+        board_owner, board_count = self.owner.reshape(-1), self.count.reshape(-1)
+        owners, counts = board_owner[cells], board_count[cells]
+        board_owner[cells] = 0
+        board_count[cells] = 0
+        previous_owner, previous_count = board_owner[targets], board_count[targets]
+        added = previous_count + hits
+        board_owner[targets] = owner
+        board_count[targets] = added
+
+        self.cells -= np.bincount(owners, minlength=3) + np.bincount(previous_owner, minlength=3)
+        self.cells[0] += len(cells)
+        self.cells[owner] += len(targets)
+        self.orbs -= (np.bincount(owners, weights=counts, minlength=3) +
+                      np.bincount(previous_owner, weights=previous_count, minlength=3)).astype(np.int64)
+        self.orbs[owner] += int(added.sum())
+        self.zobrist ^= self.cell_keys(np.concatenate([cells, targets, targets]),
+                                       np.concatenate([owners, previous_owner, np.full(len(targets), owner, np.int8)]),
+                                       np.concatenate([counts, previous_count, added]))
+        return counts, previous_owner, previous_count
+
+    def explode_each(self, cells, neighbours, owner):
+        """Board.explode for a few cells, one Python step per cell.
+
+        ``cells`` is a sorted list of flat indices and ``neighbours[i]`` the
+        (row, col, flat index) neighbours cells[i] sends an orb to, as
+        returned by Topology.adjacent. For a wave of a few cells this
+        beats the fixed cost of explode's array calls. Returns the same
+        arrays as explode, plus the sorted targets.
+        """
+        board_owner, board_count = self.owner.reshape(-1), self.count.reshape(-1)
+        keys, last = self.keys.reshape(-1), ZOBRIST_COUNTS - 1  # Flat [(cell * 2 + owner - 1) * ZOBRIST_COUNTS + count]
+        totals, orbs = self.cells.tolist(), self.orbs.tolist()
+        zobrist = self.zobrist
+        counts = []
+        for cell in cells:
+            previous, count = int(board_owner[cell]), int(board_count[cell])
+            if previous:
+                zobrist ^= int(keys[(2 * cell + previous - 1) * ZOBRIST_COUNTS + min(count, last)])
+            totals[previous] -= 1
+            totals[0] += 1
+            orbs[previous] -= count
+            board_owner[cell] = 0
+            board_count[cell] = 0
+            counts.append(count)
+
+        hits = {}
+        for adjacent in neighbours:
+            for _, _, target in adjacent:
+                hits[target] = hits.get(target, 0) + 1
+        targets = sorted(hits)
+        previous_owners, previous_counts = [], []
+        for target in targets:
+            previous, count = int(board_owner[target]), int(board_count[target])
+            added = count + hits[target]
+            if previous:
+                zobrist ^= int(keys[(2 * target + previous - 1) * ZOBRIST_COUNTS + min(count, last)])
+            zobrist ^= int(keys[(2 * target + owner - 1) * ZOBRIST_COUNTS + min(added, last)])
+            totals[previous] -= 1
+            totals[owner] += 1
+            orbs[previous] -= count
+            orbs[owner] += added
+            board_owner[target] = owner
+            board_count[target] = added
+            previous_owners.append(previous)
+            previous_counts.append(count)
+
+        self.cells[:] = totals
+        self.orbs[:] = orbs
+        self.zobrist = zobrist
+        return (np.array(counts, dtype=np.int8), targets, np.array(previous_owners, dtype=np.int8),
+                np.array(previous_counts, dtype=np.int8))
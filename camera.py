@@ -0,0 +1,120 @@
+import pygame
+
+ZOOM_STEP = 1.25  # Cell size factor per zoom step (one mouse wheel notch)
+
+
+class Camera:
+    """Maps board cells to screen pixels for a zoomable, scrollable grid viewport.
+
+    The board is laid out in world pixels (``cell_size`` per cell) and
+    ``x``/``y`` is the world pixel shown at the viewport's top-left corner.
+    The smallest zoom fits the whole board into the viewport, so on boards
+    that already fit at ``max_cell_size`` the camera never moves.
+
+    With ``stagger`` odd rows sit half a cell to the right, the brick
+    layout hex boards are drawn in.
+    """
+
+    def __init__(self, rows, cols, viewport, max_cell_size, stagger=False):
+        self.rows = rows
+        self.cols = cols
+        self.stagger = stagger
+        self.viewport = pygame.Rect(viewport)
+        self.max_cell_size = max_cell_size
+        width = cols + 0.5 if stagger else cols
+        fit = min(int(self.viewport.width / width), self.viewport.height // rows)
+        self.min_cell_size = max(1, min(max_cell_size, fit))
+        self.cell_size = self.min_cell_size
+        self.x = 0
+        self.y = 0
+
+    def fit(self):
+        """Zoom out to show the whole board; returns True if the view changed"""
+        changed = (self.cell_size, self.x, self.y) != (self.min_cell_size, 0, 0)
+        self.cell_size = self.min_cell_size
+        self.x = self.y = 0
+        return changed
+
+    def row_shift(self, row):
+        """World pixels a row is shifted right by (half a cell on odd rows when staggered)"""
+        return self.cell_size // 2 if self.stagger and row % 2 else 0
+
+    def world_size(self):
+        """Width and height of the whole board in world pixels"""
+        size = self.cell_size
+        return self.cols * size + (size // 2 if self.stagger and self.rows > 1 else 0), self.rows * size
+
+    def cell_rect(self, row, col):
+        size = self.cell_size
+        return pygame.Rect(self.viewport.x + col * size + self.row_shift(row) - self.x,
+                           self.viewport.y + row * size - self.y, size, size)
+
+    def cell_center(self, row, col):
+        """Return screen coordinates of a cell's center"""
+        size = self.cell_size
+        return (self.viewport.x + col * size + self.row_shift(row) - self.x + size // 2,
+                self.viewport.y + row * size - self.y + size // 2)
+
+    def cell_at(self, pos):
+        """Return the (row, col) under a screen position, or None outside the board"""
+        if not self.viewport.collidepoint(pos):
+            return None
+        row = (pos[1] - self.viewport.y + self.y) // self.cell_size
+        col = (pos[0] - self.viewport.x + self.x - self.row_shift(row)) // self.cell_size
+        if row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def grid_rect(self):
+        """Screen area covered by the board, clipped to the viewport"""
+        width, height = self.world_size()
+        return pygame.Rect(self.viewport.x - self.x, self.viewport.y - self.y, width, height).clip(self.viewport)
+
+    def visible_cells(self, rect=None):
+        """Return (rows, cols) ranges of the cells overlapping rect (default: the whole viewport)"""
+        rect = self.viewport if rect is None else pygame.Rect(rect).clip(self.viewport)
+        if rect.width == 0 or rect.height == 0:
+            return range(0), range(0)
+        size = self.cell_size
+        left = rect.left - self.viewport.x + self.x
+        top = rect.top - self.viewport.y + self.y
+        # Staggered rows: take the columns touching rect in either kind of row
+        shifted = left - size // 2 if self.stagger else left
+        cols = range(max(0, shifted // size), min(self.cols, (left + rect.width - 1) // size + 1))
+        rows = range(top // size, min(self.rows, (top + rect.height - 1) // size + 1))
+        return rows, cols
+
+    def is_visible(self, row, col):
+        return self.cell_rect(row, col).colliderect(self.viewport)
+
+    def clamp(self):
+        width, height = self.world_size()
+        self.x = max(0, min(self.x, width - self.viewport.width))
+        self.y = max(0, min(self.y, height - self.viewport.height))
+
+    def pan(self, dx, dy):
+        """Scroll by (dx, dy) screen pixels; returns the distance actually moved"""
+        x, y = self.x, self.y
+        self.x += dx
+        self.y += dy
+        self.clamp()
+        return self.x - x, self.y - y
+
+    def zoom(self, steps, pos=None):
+        """Zoom in (positive steps) or out around a screen position; returns True if the zoom changed"""
+        size = int(round(self.cell_size * ZOOM_STEP ** steps))
+        if size == self.cell_size:
+            size += 1 if steps > 0 else -1
+        size = max(self.min_cell_size, min(self.max_cell_size, size))
+        if size == self.cell_size:
+            return False
+
+        # Keep the world point under pos where it is on screen
+        px, py = self.viewport.center if pos is None else pos
+        px -= self.viewport.x
+        py -= self.viewport.y
+        self.x = (self.x + px) * size // self.cell_size - px
+        self.y = (self.y + py) * size // self.cell_size - py
+        self.cell_size = size
+        self.clamp()
+        return True
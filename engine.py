@@ -0,0 +1,450 @@
+import time
+import numpy as np
+from collections import deque, namedtuple
+from board import Board, ZOBRIST_SIDE
+from resolver import has_opponent, resolve_cascade
+from topology import GRID, board_shape, get_topology
+
+# Rules constants (no pygame here - the engine must run headless)
+MIN_MOVES_TO_WIN = 2  # Minimum moves before game can end
+SMALL_UNDO = 1024  # Cascades hitting fewer cells than this build their undo step cell by cell
+
+
+# A full copy of the game state (see snapshot/restore); board is None in undo steps
+EngineState = namedtuple("EngineState", ["board", "current_player", "player_timers", "player_moves",
+                                         "move_count", "game_over", "winner", "cascade_exhausted", "forfeited"],
+                         defaults=(False,))
+# One undoable move: the cells it changed with their values on the other side of the move
+UndoStep = namedtuple("UndoStep", ["row", "col", "cells", "owners", "counts", "state"])
+
+
+def monotonic_ms():
+    """Default clock: milliseconds from a monotonic source"""
+    return int(time.monotonic() * 1000)
+
+
+class ChainReactionEngine:
+    """Headless chain reaction rules: board, moves, explosions, winner and timers.
+
+    Players are numbered 0 and 1; on the board a cell owner is 0 for empty
+    and player + 1 otherwise. ``clock`` returns the current time in
+    milliseconds and is only used for the turn timers, so simulations can
+    pass a fake clock (or ignore timers entirely).
+
+    With ``instant=True`` a move's whole chain reaction is resolved inside
+    make_move by the vectorized wave resolver; the waves are kept in
+    ``last_cascade`` for replay. Waves explode every critical cell at once,
+    so a cascade can end in a different position than the one-cell-at-a-time
+    explosion queue used otherwise.
+
+    With ``stop_on_elimination`` a chain reaction stops as soon as the
+    other player has no orbs left, instead of exploding forever around a
+    board owned by one side. ``max_explosions`` (both modes) and
+    ``max_waves`` (instant mode) cap a single cascade; a cascade that runs
+    out of budget sets ``cascade_exhausted`` and ends the game, scored by
+    check_winner or as a draw if both players still have orbs.
+
+    In instant mode an optional TranspositionTable caches resolved
+    cascades by (position_hash(), row, col), so repeated positions reached
+    through different move orders are only resolved once.
+
+    A ``recorder`` attached after construction (see movelog.MoveRecorder)
+    is handed every accepted move before it is played.
+
+    ``grid_size`` is the side of a square board or a (rows, cols) pair,
+    and ``topology`` names how cells connect: "grid", "torus" or "hex"
+    (see topology.py). A cell explodes once it holds as many orbs as it
+    has neighbours.
+
+    snapshot() and restore() copy the whole state (board, timers, move
+    counters, player to move). Every settled move is also kept for undo()
+    and redo() as the earlier values of just the cells its cascade touched,
+    so a move costs no full-board copy. A game lost on time or by
+    resignation (``forfeited``) can't be taken back. With ``history=False``
+    no undo steps are kept at all, and ``last_changed`` (the flat indices
+    of the cells the last move touched) is the only record of a move.
+    """
+
+    def __init__(self, grid_size=8, timer=60, clock=None, instant=False,
+                 stop_on_elimination=True, max_waves=None, max_explosions=None,
+                 transpositions=None, topology=GRID, history=True):
+        self.grid_size = grid_size
+        self.rows, self.cols = board_shape(grid_size)
+        self.topology = get_topology(self.rows, self.cols, topology)
+        self.current_player = 0
+        self.game_over = False
+        self.winner = None
+        self.board = Board((self.rows, self.cols))
+        self.critical = self.topology.critical
+        self.instant = instant
+        self.last_cascade = []  # Waves of the most recent instant-mode chain reaction
+        self.stop_on_elimination = stop_on_elimination
+        self.max_waves = max_waves
+        self.max_explosions = max_explosions
+        self.cascade_explosions = 0  # Explosions so far in the current queued chain reaction
+        self.cascade_exhausted = False  # Whether the last chain reaction ran out of budget
+        self.forfeited = False  # Whether the game ended by resignation or timeout rather than on the board
+        self.transpositions = transpositions
+        self.recorder = None
+        self.history = history
+        self.last_changed = np.empty(0, dtype=np.intp)  # Flat indices of the cells the last move touched
+        self.undo_stack = []  # UndoStep per played move, most recent last
+        self.redo_stack = []
+        self.undo_base = None  # (row, col, state without board) from before the move still resolving
+        self.undo_cells = {}  # Flat index -> (owner, count) before the move, for the cells it touched so far
+        self.clock = clock or monotonic_ms
+        self.timer = timer
+        self.player_timers = [timer, timer]
+        self.last_time_update = self.clock()
+        self.move_count = 0  # Track total moves made
+        self.player_moves = [0, 0]
+        self.explosion_queue = deque()  # Queue for processing chain reactions
+        self.processing_explosions = False  # Flag to track if we're mid-chain reaction
+
+    def get_critical_mass(self, row, col):
+        """Return critical mass for cell position"""
+        return self.topology.critical_list[row * self.cols + col]
+
+    def is_valid_move(self, row, col):
+        """Check if move is valid for current player"""
+        # Can't move during chain reactions
+        if self.processing_explosions:
+            return False
+
+        # Check if coordinates are within grid bounds
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return False
+
+        # Empty cell is always valid, otherwise can only add to your own orbs
+        owner = self.board.owner[row, col]
+        return owner == 0 or owner == self.current_player + 1
+
+    def make_move(self, row, col):
+        """Place an orb; explosions are queued for process_explosions unless instant"""
+        if not self.is_valid_move(row, col) or self.game_over:
+            return False
+
+        if self.recorder is not None:
+            self.recorder.record(self, row, col)
+
+        move_key = (self.position_hash(), row, col)
+        self.undo_base = (row, col, self.snapshot(copy_board=False))
+        self.undo_cells = {row * self.cols + col: self.board.cell(row, col)}
+        self.redo_stack.clear()
+        count = self.board.add_orb(row, col, self.current_player + 1)
+
+        # Increment move counter
+        self.move_count += 1
+        self.player_moves[self.current_player] += 1
+
+        # Check for explosion
+        self.last_cascade = []
+        if count < self.critical[row, col]:
+            # No explosion, switch player immediately
+            self.switch_player()
+            self.start_turn_clock()
+            self.push_undo()
+        elif self.instant:
+            # Resolve the whole chain reaction now, one vectorized wave at a time
+            cascade = self.resolve_instant(move_key, row * self.cols + col)
+            self.last_cascade = cascade.waves
+            self.finish_cascade(cascade.exhausted, cascade.waves)
+        else:
+            # Add to explosion queue instead of processing immediately
+            self.explosion_queue.append((row, col))
+            self.processing_explosions = True
+            self.cascade_explosions = 0
+            # Don't switch player yet - wait until chain reaction finishes
+
+        return True
+
+    def resolve_instant(self, move_key, cell):
+        """Resolve the cascade set off at flat index cell with the wave resolver (through the transposition table)"""
+        table = self.transpositions
+        if table is not None:
+            cached = table.get(move_key)
+            if cached is not None:
+                board, cascade = cached
+                self.board = board.copy()
+                return cascade
+
+        cascade = resolve_cascade(self.board, self.current_player + 1, self.topology,
+                                  self.stop_on_elimination, self.max_waves, self.max_explosions, start=[cell])
+        if table is not None:
+            table.put(move_key, (self.board.copy(), cascade))
+        return cascade
+
+    def explode_cell(self, row, col):
+        """Explode a single cell and queue neighbours that reach critical mass.
+
+        Returns ``(player, count, targets)`` where ``targets`` lists
+        ``(row, col, previous_owner)`` for every neighbour that received an
+        orb, or None if the cell no longer needs to explode.
+        """
+        board = self.board
+        critical = self.topology.critical_list
+        player, count = board.cell(row, col)
+        if count == 0 or count < critical[row * self.cols + col]:
+            return None
+
+        # Remove the exploded orb
+        board.clear_cell(row, col)
+
+        # Distribute orbs to the neighbours from the precomputed table, capturing them for the exploding player
+        targets = []
+        for new_row, new_col, cell in self.topology.adjacent(row, col):
+            if cell not in self.undo_cells:
+                self.undo_cells[cell] = board.cell(new_row, new_col)
+            targets.append((new_row, new_col, int(board.owner[new_row, new_col])))
+            new_count = board.add_orb(new_row, new_col, player)
+
+            # Check if this newly affected cell should now explode
+            if new_count >= critical[cell]:
+                self.explosion_queue.append((new_row, new_col))
+
+        return player, count, targets
+
+    def process_explosions(self, limit=None):
+        """Process pending explosions from the queue.
+
+        At most ``limit`` cells explode per call (all of them when None),
+        so a view can spread a chain reaction over several frames; this is
+        separate from ``self.max_explosions``, the budget of the whole
+        cascade. Returns the list of explode_cell results for this call.
+        """
+        exploded = []
+        exhausted = False
+        while self.explosion_queue and (limit is None or len(exploded) < limit):
+            if self.max_explosions is not None and self.cascade_explosions >= self.max_explosions:
+                exhausted = bool((self.board.count >= self.critical).any())
+                self.explosion_queue.clear()
+                break
+
+            row, col = self.explosion_queue.popleft()
+            result = self.explode_cell(row, col)
+            if result is None:
+                continue
+            exploded.append((row, col) + result)
+            self.cascade_explosions += 1
+
+            # Stop the chain reaction once it has wiped out the other player
+            player, _, targets = result
+            if (self.stop_on_elimination and
+                    any(previous not in (0, player) for _, _, previous in targets) and
+                    not has_opponent(self.board, player)):
+                self.explosion_queue.clear()
+
+        # If queue is empty and we were processing explosions, check for game end
+        if not self.explosion_queue and self.processing_explosions:
+            self.finish_cascade(exhausted)
+
+        return exploded
+
+    def finish_cascade(self, exhausted=False, waves=()):
+        """End a chain reaction: check for a winner, then hand over the turn.
+
+        ``waves`` are the instant-mode waves, whose targets' earlier values
+        go into the move's UndoStep.
+        """
+        self.processing_explosions = False
+        self.cascade_exhausted = exhausted
+        self.check_winner()
+        if exhausted and not self.game_over:
+            # Critical cells are left on the board, so the game can't go on
+            self.game_over = True
+            self.winner = None
+        if not self.game_over:
+            self.switch_player()
+        self.start_turn_clock()
+        self.push_undo(waves)
+
+    def snapshot(self, copy_board=True):
+        """Return an EngineState copy of the settled game state (with board None unless copy_board)"""
+        return EngineState(self.board.copy() if copy_board else None, self.current_player, tuple(self.player_timers),
+                           tuple(self.player_moves), self.move_count, self.game_over, self.winner,
+                           self.cascade_exhausted, self.forfeited)
+
+    def restore(self, state, keep_history=False):
+        """Return to a snapshot; any chain reaction in progress is dropped.
+
+        The undo and redo history is cleared unless keep_history is set,
+        since its diffs only apply to the line of play they came from.
+        """
+        if not keep_history:
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+        if state.board is not None:
+            self.board = state.board.copy()
+        self.current_player = state.current_player
+        self.player_timers = list(state.player_timers)
+        self.player_moves = list(state.player_moves)
+        self.move_count = state.move_count
+        self.game_over = state.game_over
+        self.winner = state.winner
+        self.cascade_exhausted = state.cascade_exhausted
+        self.forfeited = state.forfeited
+        self.explosion_queue.clear()
+        self.processing_explosions = False
+        self.cascade_explosions = 0
+        self.last_cascade = []
+        self.last_changed = np.empty(0, dtype=np.intp)
+        self.undo_base = None
+        self.undo_cells = {}
+        self.start_turn_clock()  # The restored player's second starts now
+
+    def push_undo(self, waves=()):
+        """Turn the state and cells saved before the move that just settled into an UndoStep.
+
+        Cells are stored with their value at first touch: the placed cell
+        and queued explosions' neighbours come from undo_cells, instant
+        waves from each wave's targets. A cell only explodes after being
+        touched, since moves start from a settled board. The cells also
+        become ``last_changed``; the step itself is only kept with
+        ``history`` on.
+        """
+        if self.undo_base is None:
+            return
+        row, col, before = self.undo_base
+        touched = self.undo_cells
+        if waves and sum(len(wave.targets) for wave in waves) < SMALL_UNDO:
+            # A short cascade merges into the dict, cheaper than the full-board arrays below
+            for wave in waves:
+                for cell, owner, count in zip(wave.targets.tolist(), wave.previous_owner.tolist(),
+                                              wave.previous_count.tolist()):
+                    touched.setdefault(cell, (owner, count))
+            waves = ()
+        order = sorted(touched)
+        cells = np.array(order, dtype=np.intp)
+        owners = np.array([touched[cell][0] for cell in order], dtype=np.int8)
+        counts = np.array([touched[cell][1] for cell in order], dtype=np.int8)
+        if waves:
+            # Keep each cell's value from its first touch, in one pass over the waves
+            seen = np.zeros(self.topology.cells, dtype=bool)
+            first_owner = np.zeros(self.topology.cells, dtype=np.int8)
+            first_count = np.zeros(self.topology.cells, dtype=np.int8)
+            seen[cells], first_owner[cells], first_count[cells] = True, owners, counts
+            for wave in waves:
+                new = ~seen[wave.targets]
+                first = wave.targets[new]
+                seen[first] = True
+                first_owner[first] = wave.previous_owner[new]
+                first_count[first] = wave.previous_count[new]
+            cells = np.flatnonzero(seen)
+            owners, counts = first_owner[cells], first_count[cells]
+        self.last_changed = cells
+        if self.history:
+            self.undo_stack.append(UndoStep(row, col, cells, owners, counts, before))
+        self.undo_base = None
+        self.undo_cells = {}
+
+    def step_back(self, source, target):
+        """Apply the last UndoStep of source and push its inverse onto target"""
+        if self.processing_explosions or self.forfeited or not source:
+            return None
+        step = source.pop()
+        state = self.snapshot(copy_board=False)
+        owners, counts = self.board.set_cells(step.cells, step.owners, step.counts)
+        self.restore(step.state, keep_history=True)
+        self.last_changed = step.cells
+        target.append(step._replace(owners=owners, counts=counts, state=state))
+        return step
+
+    def undo(self):
+        """Take back the last move; returns False if there is none, a cascade is running or the game was forfeited"""
+        step = self.step_back(self.undo_stack, self.redo_stack)
+        if step is not None and self.recorder is not None:
+            self.recorder.undo(self)
+        return step is not None
+
+    def redo(self):
+        """Replay the last undone move; returns False if there is none.
+
+        The clocks are left as they are now rather than put back to when
+        the move was undone, so time spent while it was taken back still
+        counts, and the move log records the same clocks the game keeps.
+        """
+        if self.recorder is not None and self.redo_stack and not self.processing_explosions and not self.forfeited:
+            self.recorder.record(self, self.redo_stack[-1].row, self.redo_stack[-1].col)
+        timers = self.player_timers
+        if self.step_back(self.redo_stack, self.undo_stack) is None:
+            return False
+        self.player_timers = timers
+        return True
+
+    def resign(self, player):
+        """End the game with player (0 or 1) losing: resigned, out of time or disconnected"""
+        if self.game_over:
+            return False
+        self.explosion_queue.clear()
+        self.processing_explosions = False
+        self.game_over = True
+        self.winner = 1 - player
+        self.forfeited = True
+        return True
+
+    def switch_player(self):
+        """Switch to next player"""
+        self.current_player = (self.current_player + 1) % 2
+
+        # After switching, check if current player has any valid moves:
+        # an empty cell or one of their own
+        cells = self.board.cells
+        has_valid_moves = cells[0] > 0 or cells[self.current_player + 1] > 0
+
+        if not has_valid_moves:
+            # If no valid moves, switch back and declare other player winner
+            self.current_player = (self.current_player + 1) % 2
+            self.game_over = True
+            self.winner = self.current_player
+
+    def check_winner(self):
+        """Check if only one player remains (after minimum moves)"""
+        if self.move_count < MIN_MOVES_TO_WIN:
+            return  # Don't check for winner until minimum moves have been made
+
+        active_players = [player for player in range(2) if self.cell_count(player) > 0]
+
+        if len(active_players) == 1:
+            self.game_over = True
+            self.winner = active_players[0]
+        elif len(active_players) == 0 and self.move_count > 0:
+            self.game_over = True
+            self.winner = None  # Draw
+
+    def position_hash(self):
+        """Return the Zobrist hash of the board and the side to move"""
+        return self.board.zobrist ^ (ZOBRIST_SIDE if self.current_player else 0)
+
+    def cell_count(self, player):
+        """Return the number of cells owned by a player (0 or 1)"""
+        return int(self.board.cells[player + 1])
+
+    def orb_count(self, player):
+        """Return the total number of orbs a player (0 or 1) has on the board"""
+        return int(self.board.orbs[player + 1])
+
+    def start_turn_clock(self):
+        """Start timing the player to move from now.
+
+        Called when a turn begins: after a quiet move, when a cascade
+        settles and on restore. A view that shows a cascade before handing
+        over the turn calls it again once playback ends, so the animation
+        isn't charged to the next player.
+        """
+        self.last_time_update = self.clock()
+
+    def update_timers(self):
+        """Count down the current player's timer once per elapsed second"""
+        current_time = self.clock()
+        if not self.game_over and not self.processing_explosions and current_time - self.last_time_update >= 1000:
+            self.player_timers[self.current_player] -= 1
+            self.last_time_update = current_time
+            if self.player_timers[self.current_player] <= 0:
+                self.resign(self.current_player)  # Other player wins
+
+    def play(self, row, col):
+        """Make a move and resolve its whole chain reaction immediately"""
+        if not self.make_move(row, col):
+            return False
+        self.process_explosions()
+        return True
@@ -0,0 +1,307 @@
+"""Compact binary move logs: record matches, replay them headless and seek to any move.
+
+    python movelog.py match.aslog --move 40
+
+A log is a fixed header followed by tagged little-endian records:
+
+    header    magic "ASML", version, timer, rule flags and budgets, keyframe
+              interval, rows, columns and topology
+    move      b"M" row, col, player, timestamp, the mover's remaining seconds
+              and the milliseconds of the current second already used
+    keyframe  b"K" the position before a move: move index, player to move,
+              timers, per-player move counts, the clock at the last timer
+              update and the zlib-compressed owner and count planes
+    takeback  b"U" timestamp; the last move was undone
+    end       b"E" winner (-1 for a draw), timestamp and both players'
+              remaining seconds, once the game is over
+
+Timestamps are milliseconds since recording started. Replays re-run the
+headless engine with the recorded rules, starting from the nearest
+keyframe at or before the requested move, and put each mover's clock back
+as it was recorded. The clock only runs while it is a player's turn to
+think, not while a view plays a cascade back.
+"""
+import argparse
+import struct
+import sys
+import zlib
+import numpy as np
+from board import Board
+from engine import ChainReactionEngine, EngineState
+from topology import GRID, TOPOLOGIES, board_shape
+
+MAGIC = b"ASML"
+FORMAT_VERSION = 1
+KEYFRAME_INTERVAL = 64  # Moves between board snapshots
+
+# magic, version, timer, instant, stop, max_waves, max_explosions, interval, rows, cols, index into TOPOLOGIES
+HEADER = struct.Struct("<4sBHBBIIHHHB")
+MOVE = struct.Struct("<HHBIiH")  # row, col, player, timestamp, mover's timer, ms into the current second
+KEYFRAME = struct.Struct("<IB2i2IiI")  # move index, player, timers, player moves, last timer update, payload size
+END = struct.Struct("<bI2i")  # winner, timestamp, timers
+TAKEBACK = struct.Struct("<I")  # timestamp
+MOVE_TAG = b"M"
+KEYFRAME_TAG = b"K"
+END_TAG = b"E"
+TAKEBACK_TAG = b"U"
+
+
+class MoveRecorder:
+    """Writes every move made on an engine to a binary log file.
+
+    Attach it with ``engine.recorder = MoveRecorder(path, engine)``; the
+    engine then hands it each accepted move. Records are flushed as they
+    are written, so a crashed match still leaves a readable log.
+    """
+
+    def __init__(self, path, engine, keyframe_interval=KEYFRAME_INTERVAL):
+        self.file = open(path, "wb")
+        self.keyframe_interval = keyframe_interval
+        self.start = engine.clock()
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, engine.timer, engine.instant, engine.stop_on_elimination,
+                                    engine.max_waves or 0, engine.max_explosions or 0, keyframe_interval,
+                                    engine.rows, engine.cols, TOPOLOGIES.index(engine.topology.kind)))
+        self.file.flush()
+
+    def timestamp(self, engine):
+        return max(0, engine.clock() - self.start)
+
+    def record(self, engine, row, col):
+        """Log a move about to be played (the board is settled at this point)"""
+        if engine.move_count % self.keyframe_interval == 0:
+            self.write_keyframe(engine)
+        player = engine.current_player
+        used = min(0xFFFF, max(0, engine.clock() - engine.last_time_update))
+        self.file.write(MOVE_TAG + MOVE.pack(row, col, player, self.timestamp(engine), engine.player_timers[player],
+                                             used))
+        self.file.flush()
+
+    def undo(self, engine):
+        """Log that the last move was taken back"""
+        self.file.write(TAKEBACK_TAG + TAKEBACK.pack(self.timestamp(engine)))
+        self.file.flush()
+
+    def write_keyframe(self, engine):
+        board = engine.board
+        payload = zlib.compress(board.owner.tobytes() + board.count.tobytes())
+        self.file.write(KEYFRAME_TAG + KEYFRAME.pack(engine.move_count, engine.current_player,
+                                                     *engine.player_timers, *engine.player_moves,
+                                                     engine.last_time_update - self.start, len(payload)))
+        self.file.write(payload)
+
+    def close(self, engine=None):
+        """Close the file, first logging the result if engine's game is over"""
+        if self.file.closed:
+            return
+        if engine is not None and engine.game_over:
+            winner = engine.winner if engine.winner is not None else -1
+            self.file.write(END_TAG + END.pack(winner, self.timestamp(engine), *engine.player_timers))
+        self.file.close()
+
+
+class Keyframe:
+    """A snapshot of the position before move ``index``"""
+
+    def __init__(self, index, player, timers, player_moves, last_time_update, owner, count):
+        self.index = index
+        self.player = player
+        self.timers = timers
+        self.player_moves = player_moves
+        self.last_time_update = last_time_update
+        self.owner = owner
+        self.count = count
+
+
+class MoveLog:
+    """A parsed move log: rules from the header, the moves, keyframes and the result"""
+
+    def __init__(self, grid_size=8, timer=60, instant=False, stop_on_elimination=True,
+                 max_waves=None, max_explosions=None, keyframe_interval=KEYFRAME_INTERVAL, topology=GRID):
+        self.grid_size = grid_size  # Side of a square board or (rows, cols)
+        self.rows, self.cols = board_shape(grid_size)
+        self.topology = topology
+        self.timer = timer
+        self.instant = instant
+        self.stop_on_elimination = stop_on_elimination
+        self.max_waves = max_waves
+        self.max_explosions = max_explosions
+        self.keyframe_interval = keyframe_interval
+        self.moves = []  # (row, col, player, timestamp, timer, used)
+        self.keyframes = []  # Keyframe, in move order
+        self.winner = None  # 0 or 1, -1 for a draw, None if the log has no end record
+        self.end_time = None
+        self.end_timers = None  # Both players' seconds left at the end
+        self.truncated = False  # Whether the file ended in the middle of a record
+
+    def __len__(self):
+        return len(self.moves)
+
+    @classmethod
+    def read(cls, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            raise ValueError("not a move log: file too short")
+        magic, version, timer, instant, stop, max_waves, max_explosions, interval, rows, cols, kind = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a move log: bad magic")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported move log version {version}")
+        if kind >= len(TOPOLOGIES):
+            raise ValueError(f"corrupt move log: unknown topology {kind}")
+        offset = HEADER.size
+        log = cls((rows, cols), timer, bool(instant), bool(stop), max_waves or None, max_explosions or None, interval,
+                  TOPOLOGIES[kind])
+
+        shape = (log.rows, log.cols)
+        cells = log.rows * log.cols
+        try:
+            while offset < len(data):
+                tag = data[offset:offset + 1]
+                offset += 1
+                if tag == MOVE_TAG:
+                    log.moves.append(MOVE.unpack_from(data, offset))
+                    offset += MOVE.size
+                elif tag == KEYFRAME_TAG:
+                    index, player, timer0, timer1, moves0, moves1, last_update, size = \
+                        KEYFRAME.unpack_from(data, offset)
+                    offset += KEYFRAME.size
+                    planes = np.frombuffer(zlib.decompress(data[offset:offset + size]), dtype=np.int8)
+                    offset += size
+                    owner = planes[:cells].reshape(shape)
+                    count = planes[cells:].reshape(shape)
+                    log.keyframes.append(Keyframe(index, player, [timer0, timer1], [moves0, moves1],
+                                                  last_update, owner, count))
+                elif tag == TAKEBACK_TAG:
+                    TAKEBACK.unpack_from(data, offset)
+                    if not log.moves:
+                        raise ValueError(f"corrupt move log: takeback with no move before it at byte {offset - 1}")
+                    offset += TAKEBACK.size
+                    log.moves.pop()
+                    # Keyframes after the takeback point belong to the abandoned line
+                    while log.keyframes and log.keyframes[-1].index > len(log.moves):
+                        log.keyframes.pop()
+                elif tag == END_TAG:
+                    log.winner, log.end_time, *log.end_timers = END.unpack_from(data, offset)
+                    offset += END.size
+                else:
+                    raise ValueError(f"corrupt move log: unknown record {tag!r} at byte {offset - 1}")
+        except (struct.error, zlib.error):
+            # Cut off mid-record (e.g. by a crash): keep everything before it
+            log.truncated = True
+        return log
+
+
+class Replay:
+    """Rebuilds positions of a MoveLog with the headless engine"""
+
+    def __init__(self, log):
+        self.log = log
+        self.now = 0  # Replay clock, in log milliseconds
+
+    def new_engine(self):
+        log = self.log
+        return ChainReactionEngine(log.grid_size, log.timer, clock=lambda: self.now, instant=log.instant,
+                                   stop_on_elimination=log.stop_on_elimination, max_waves=log.max_waves,
+                                   max_explosions=log.max_explosions, topology=log.topology)
+
+    def keyframe_before(self, index):
+        """Return the latest keyframe before move index, or None.
+
+        A keyframe is written as its move is made, so its clocks are already
+        past the moment the previous move settled; seeking to exactly its
+        index replays from an earlier one instead.
+        """
+        best = None
+        for keyframe in self.log.keyframes:
+            if keyframe.index >= index:
+                break
+            best = keyframe
+        return best
+
+    def seek(self, index):
+        """Return an engine holding the position after the first index moves"""
+        log = self.log
+        if not 0 <= index <= len(log.moves):
+            raise IndexError(f"move {index} out of range (log has {len(log.moves)} moves)")
+        self.now = 0
+        engine = self.new_engine()
+        keyframe = self.keyframe_before(index)
+        start = 0
+        if keyframe is not None:
+            start = keyframe.index
+            self.now = keyframe.last_time_update
+            engine.restore(EngineState(Board(log.grid_size, keyframe.owner.copy(), keyframe.count.copy()),
+                                       keyframe.player, keyframe.timers, keyframe.player_moves, keyframe.index,
+                                       False, None, False))
+
+        for move in log.moves[start:index]:
+            self.play(engine, move)
+        if index == len(log.moves):
+            self.finish(engine)
+        return engine
+
+    def play(self, engine, move):
+        """Replay one logged move, first setting the mover's clock as it was recorded"""
+        row, col, player, timestamp, timer, used = move
+        self.now = timestamp
+        engine.player_timers[player] = timer
+        engine.last_time_update = timestamp - used
+        if player != engine.current_player or not engine.play(row, col):
+            raise ValueError(f"move log does not replay: move {engine.move_count} ({row}, {col}) "
+                             f"by player {player} is illegal")
+
+    def finish(self, engine):
+        """Apply the logged end of the game: the final clocks and a result reached off the board (on time)"""
+        log = self.log
+        if log.winner is None:
+            return
+        self.now = log.end_time
+        engine.player_timers = list(log.end_timers)
+        if log.winner >= 0 and not engine.game_over:
+            engine.resign(1 - log.winner)
+
+    def positions(self):
+        """Yield (index, engine) after every move, replaying the log once from the start"""
+        self.now = 0
+        engine = self.new_engine()
+        yield 0, engine
+        for index, move in enumerate(self.log.moves, 1):
+            self.play(engine, move)
+            if index == len(self.log.moves):
+                self.finish(engine)
+            yield index, engine
+
+
+def format_board(board):
+    """Render a board as text: '.' for empty cells, A/B plus the orb count otherwise"""
+    return "\n".join(" ".join("." if owner == 0 else f"{'AB'[owner - 1]}{count}"
+                              for owner, count in zip(owners, counts))
+                     for owners, counts in zip(board.owner.tolist(), board.count.tolist()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a recorded match and show the board at any move.")
+    parser.add_argument("log", help="a .aslog file written by MoveRecorder")
+    parser.add_argument("--move", type=int, help="show the position after this many moves (default: the last)")
+    args = parser.parse_args(argv)
+
+    log = MoveLog.read(args.log)
+    index = len(log) if args.move is None else args.move
+    if not 0 <= index <= len(log):
+        parser.error(f"--move must be between 0 and {len(log)}, the number of moves in {args.log}")
+    engine = Replay(log).seek(index)
+    mode = "instant" if log.instant else "queued"
+    print(f"{args.log}: {log.rows}x{log.cols} {log.topology}, {log.timer}s timers, {mode} cascades, "
+          f"{len(log)} moves, {len(log.keyframes)} keyframes")
+    if log.winner is not None:
+        result = "draw" if log.winner < 0 else f"player {log.winner + 1} won"
+        print(f"result: {result} after {log.end_time / 1000:.1f}s")
+    print(f"after move {index}: player {engine.current_player + 1} to move, timers {engine.player_timers}")
+    print(format_board(engine.board))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,457 @@
+"""Networked play: an asyncio server hosting many authoritative headless matches.
+
+    python network.py serve --port 8765
+    python network.py loadtest --matches 200 --grid-size 8
+
+Clients and server exchange newline-delimited JSON objects with a "type":
+
+    client -> server
+        join    {"name", "grid_size", "timer", "topology"}: queue for an
+                opponent with the same board and timer; grid_size is a side
+                length or [rows, cols], topology "grid" (default), "torus" or
+                "hex"
+        move    {"row", "col"}
+        sync    ask for the full board (after a hash mismatch)
+    server -> client
+        waiting, start {"match", "player", "names", "grid_size", "topology", "timer"}
+        update  {"move", "player", "cells", "owners", "counts", "hash", "state", "waves"}:
+                the cells the move changed (flat row * cols + col indices) with
+                their new owners and counts, the board's Zobrist hash and the
+                game state; "waves" is the number of cascade waves, which
+                clients replay from the position before the move
+        state   {"owner", "count", "hash", "state"}: the full board
+        end     {"winner", "reason"}: out of time or an opponent disconnected
+        error   {"message"}
+
+Every match runs the headless engine in instant mode, and turn clocks are
+kept by the server in milliseconds with one event-loop timer per match, so
+hundreds of matches share one thread and no SDL state.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import select
+import socket
+import sys
+import time
+import numpy as np
+from engine import ChainReactionEngine, EngineState
+from topology import GRID, TOPOLOGIES, board_shape, check_board, parse_size
+
+DEFAULT_PORT = 8765
+MAX_GRID_SIZE = 512
+MAX_TIMER = 3600
+MAX_MESSAGE = 64 * 1024 * 1024  # Longest line a client accepts (full states and diffs of big boards are large)
+MAX_REQUEST = 4096  # Longest line the server accepts; client messages are tiny
+
+
+def encode(message):
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def state_fields(engine, timers_ms):
+    """The game state sent with every update, timers in milliseconds"""
+    return {"current_player": engine.current_player, "move_count": engine.move_count,
+            "player_moves": engine.player_moves, "timers_ms": timers_ms, "game_over": engine.game_over,
+            "winner": engine.winner, "exhausted": engine.cascade_exhausted}
+
+
+def apply_state(engine, state):
+    """Copy a received game state (but not the board) onto a mirror engine"""
+    timers = [max(0, math.ceil(ms / 1000)) for ms in state["timers_ms"]]
+    engine.restore(EngineState(None, state["current_player"], timers, state["player_moves"],
+                               state["move_count"], state["game_over"], state["winner"], state["exhausted"]))
+
+
+def apply_update(engine, message):
+    """Apply an update message to a mirror engine; returns False if the board hash disagrees"""
+    cells = np.asarray(message["cells"], dtype=np.intp)
+    engine.board.set_cells(cells, np.asarray(message["owners"], dtype=np.int8),
+                           np.asarray(message["counts"], dtype=np.int8))
+    apply_state(engine, message["state"])
+    return engine.board.zobrist == message["hash"]
+
+
+def apply_full_state(engine, message):
+    """Replace a mirror engine's board and state with a state message"""
+    owner = np.asarray(message["owner"], dtype=np.int8)
+    count = np.asarray(message["count"], dtype=np.int8)
+    engine.board.set_cells(np.arange(owner.size), owner.ravel(), count.ravel())
+    apply_state(engine, message["state"])
+
+
+class Connection:
+    """One client socket on the server side"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.name = "Player"
+        self.match = None
+        self.player = None
+
+    def send(self, message):
+        if not self.writer.is_closing():
+            self.writer.write(encode(message))
+
+
+class Match:
+    """One authoritative game between two connections.
+
+    The turn clock is a single ``call_later`` handle on the event loop that
+    fires when the player to move runs out of time.
+    """
+
+    def __init__(self, match_id, connections, grid_size, timer, max_waves, topology=GRID):
+        self.match_id = match_id
+        self.connections = connections
+        self.loop = asyncio.get_running_loop()
+        self.engine = ChainReactionEngine(grid_size, timer, clock=self.clock_ms, instant=True, max_waves=max_waves,
+                                          topology=topology, history=False)
+        self.remaining = [timer * 1000, timer * 1000]  # Milliseconds left per player
+        self.turn_started = self.clock_ms()
+        self.timeout = None
+        for player, connection in enumerate(connections):
+            connection.match = self
+            connection.player = player
+
+    def clock_ms(self):
+        return int(self.loop.time() * 1000)
+
+    def timers_ms(self):
+        """Remaining time per player, with the current turn's elapsed time charged"""
+        timers = list(self.remaining)
+        if not self.engine.game_over:
+            timers[self.engine.current_player] -= self.clock_ms() - self.turn_started
+        return timers
+
+    def broadcast(self, message):
+        for connection in self.connections:
+            if connection is not None:
+                connection.send(message)
+
+    def start(self):
+        names = [connection.name for connection in self.connections]
+        for player, connection in enumerate(self.connections):
+            connection.send({"type": "start", "match": self.match_id, "player": player, "names": names,
+                             "grid_size": self.engine.grid_size, "topology": self.engine.topology.kind,
+                             "timer": self.engine.timer,
+                             "timers_ms": self.remaining})
+        self.start_clock()
+
+    def start_clock(self):
+        self.turn_started = self.clock_ms()
+        player = self.engine.current_player
+        self.timeout = self.loop.call_later(max(0, self.remaining[player]) / 1000, self.time_out, player)
+
+    def stop_clock(self):
+        player = self.engine.current_player
+        now = self.clock_ms()
+        self.remaining[player] -= now - self.turn_started
+        self.turn_started = now
+        if self.timeout is not None:
+            self.timeout.cancel()
+            self.timeout = None
+
+    def move(self, player, row, col):
+        """Play a move for player; returns an error string if it was refused"""
+        engine = self.engine
+        if engine.game_over:
+            return "game is over"
+        if player != engine.current_player:
+            return "not your turn"
+        # type() rather than isinstance(), which would take JSON true and false as rows 1 and 0
+        if type(row) is not int or type(col) is not int or not engine.is_valid_move(row, col):
+            return "illegal move"
+
+        self.stop_clock()
+        if self.remaining[player] <= 0:
+            self.end(player, "timeout")  # The timeout callback hasn't run yet, but time is up
+            return "out of time"
+        engine.make_move(row, col)
+        cells = engine.last_changed
+        board = engine.board
+        message = {"type": "update", "move": [row, col], "player": player, "cells": cells.tolist(),
+                   "owners": board.owner.flat[cells].tolist(), "counts": board.count.flat[cells].tolist(),
+                   "hash": board.zobrist}
+        if not engine.game_over:
+            self.start_clock()
+        message["state"] = state_fields(engine, self.timers_ms())
+        message["waves"] = len(engine.last_cascade)
+        self.broadcast(message)
+        return None
+
+    def end(self, player, reason):
+        """End the game with player losing for reason"""
+        if not self.engine.resign(player):
+            return
+        self.stop_clock()
+        self.remaining[player] = max(0, self.remaining[player])
+        self.broadcast({"type": "end", "winner": self.engine.winner, "reason": reason,
+                        "state": state_fields(self.engine, self.remaining)})
+
+    def time_out(self, player):
+        self.timeout = None
+        self.end(player, "timeout")
+
+    def leave(self, connection):
+        self.connections[connection.player] = None
+        self.end(connection.player, "disconnect")
+
+    def full_state(self):
+        board = self.engine.board
+        return {"type": "state", "owner": board.owner.ravel().tolist(), "count": board.count.ravel().tolist(),
+                "hash": board.zobrist, "state": state_fields(self.engine, self.timers_ms())}
+
+
+class MatchServer:
+    """Accepts clients, pairs them into matches and relays their moves to the engine"""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, max_waves=10000):
+        self.host = host
+        self.port = port
+        self.max_waves = max_waves
+        self.waiting = {}  # ((rows, cols), topology, timer) -> Connection waiting for an opponent
+        self.matches = {}  # match id -> Match, while both players are connected
+        self.match_ids = itertools.count(1)
+        self.server = None
+
+    async def start(self):
+        """Start listening; returns the bound port (useful with port 0)"""
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_REQUEST)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        for match in self.matches.values():
+            if match.timeout is not None:
+                match.timeout.cancel()
+
+    async def handle(self, reader, writer):
+        connection = Connection(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    self.dispatch(connection, message)
+                except (ValueError, KeyError, TypeError) as error:
+                    connection.send({"type": "error", "message": f"bad message: {error}"})
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass  # Dropped connection, or a line longer than MAX_REQUEST
+        finally:
+            self.disconnect(connection)
+            writer.close()
+
+    def dispatch(self, connection, message):
+        kind = message["type"]
+        if kind == "join":
+            self.join(connection, message)
+        elif kind == "move":
+            match = connection.match
+            error = "no match" if match is None else match.move(connection.player, message["row"], message["col"])
+            if error is not None:
+                connection.send({"type": "error", "message": error})
+        elif kind == "sync":
+            if connection.match is not None:
+                connection.send(connection.match.full_state())
+        else:
+            connection.send({"type": "error", "message": f"unknown message type {kind!r}"})
+
+    def join(self, connection, message):
+        grid_size = message.get("grid_size", 8)
+        if isinstance(grid_size, list):
+            grid_size = tuple(grid_size)
+        shape = board_shape(grid_size)
+        timer = message.get("timer", 60)
+        topology = message.get("topology", GRID)
+        # Exact ints only: int() of a float like 1e400 raises OverflowError, and true would pass as 1
+        if (len(shape) != 2 or not all(type(side) is int and 2 <= side <= MAX_GRID_SIZE for side in shape) or
+                type(timer) is not int or not 1 <= timer <= MAX_TIMER):
+            connection.send({"type": "error", "message": "grid size or timer out of range"})
+            return
+        check_board(*shape, topology)  # Raises ValueError (reported by handle); the tables are built once paired
+        self.leave_match(connection)
+        connection.name = str(message.get("name", "Player"))[:32]
+
+        key = (shape, topology, timer)
+        opponent = self.waiting.pop(key, None)
+        if opponent is None or opponent is connection:
+            self.waiting[key] = connection
+            connection.send({"type": "waiting"})
+            return
+        match_id = next(self.match_ids)
+        match = Match(match_id, [opponent, connection], grid_size, timer, self.max_waves, topology)
+        self.matches[match_id] = match
+        match.start()
+
+    def leave_match(self, connection):
+        """Detach a connection from its match (forfeiting it if still running) or from the queue"""
+        for key, waiting in list(self.waiting.items()):
+            if waiting is connection:
+                del self.waiting[key]
+        match = connection.match
+        if match is not None:
+            match.leave(connection)
+            connection.match = None
+            if all(other is None for other in match.connections):
+                self.matches.pop(match.match_id, None)
+
+    def disconnect(self, connection):
+        self.leave_match(connection)
+
+
+class NetworkClient:
+    """Blocking socket client polled once per frame by the pygame UI (no threads)"""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, timeout=5):
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.settimeout(None)
+        self.buffer = b""
+        self.closed = False
+
+    def send(self, message):
+        if not self.closed:
+            try:
+                self.sock.sendall(encode(message))
+            except OSError:
+                self.closed = True
+
+    def join(self, name, grid_size, timer, topology=GRID):
+        self.send({"type": "join", "name": name, "grid_size": grid_size, "topology": topology, "timer": timer})
+
+    def move(self, row, col):
+        self.send({"type": "move", "row": row, "col": col})
+
+    def sync(self):
+        self.send({"type": "sync"})
+
+    def poll(self):
+        """Return the messages that have arrived, without waiting"""
+        messages = []
+        while not self.closed and select.select([self.sock], [], [], 0)[0]:
+            try:
+                data = self.sock.recv(1 << 16)
+            except OSError:
+                data = b""
+            if not data:
+                self.closed = True
+                break
+            self.buffer += data
+        while b"\n" in self.buffer:
+            line, self.buffer = self.buffer.split(b"\n", 1)
+            messages.append(json.loads(line))
+        return messages
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+
+async def bot_client(host, port, name, grid_size, timer, seed, topology=GRID):
+    """Play one networked game with random moves, mirroring the board; returns a result dict"""
+    reader, writer = await asyncio.open_connection(host, port, limit=MAX_MESSAGE)
+    rng = random.Random(seed)
+    engine = ChainReactionEngine(grid_size, timer, clock=lambda: 0, instant=True, topology=topology)
+    player = None
+    desyncs = 0
+
+    def play():
+        if player == engine.current_player and not engine.game_over:
+            row, col = rng.choice(np.argwhere((engine.board.owner == 0) |
+                                              (engine.board.owner == player + 1)).tolist())
+            writer.write(encode({"type": "move", "row": row, "col": col}))
+
+    writer.write(encode({"type": "join", "name": name, "grid_size": grid_size, "topology": topology,
+                         "timer": timer}))
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            kind = message["type"]
+            if kind == "start":
+                player = message["player"]
+                play()
+            elif kind == "update":
+                if not apply_update(engine, message):
+                    desyncs += 1
+                    writer.write(encode({"type": "sync"}))
+                play()
+            elif kind == "state":
+                apply_full_state(engine, message)
+                play()
+            elif kind == "end":
+                apply_state(engine, message["state"])
+            elif kind == "error":
+                raise RuntimeError(f"{name}: server error {message['message']}")
+            if engine.game_over:
+                break
+            await writer.drain()
+    finally:
+        writer.close()
+    return {"player": player, "moves": engine.move_count, "winner": engine.winner,
+            "game_over": engine.game_over, "desyncs": desyncs, "hash": engine.board.zobrist}
+
+
+async def load_test(matches, grid_size, timer, seed, topology=GRID):
+    """Run matches pairs of bot clients against a local server over loopback"""
+    server = MatchServer("127.0.0.1", 0)
+    port = await server.start()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(bot_client("127.0.0.1", port, f"bot{i}", grid_size, timer, seed + i, topology)
+                                   for i in range(2 * matches)))
+    elapsed = time.perf_counter() - start
+    server.close()
+    return results, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the multiplayer server, or load-test one over loopback.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="host matches")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--max-waves", type=int, default=10000, help="cascade budget per move")
+    test = commands.add_parser("loadtest", help="play random bots against a local server")
+    test.add_argument("--matches", type=int, default=100)
+    test.add_argument("--grid-size", type=parse_size, default=(8, 8), help="side length or ROWSxCOLS")
+    test.add_argument("--topology", choices=TOPOLOGIES, default=GRID)
+    test.add_argument("--timer", type=int, default=60)
+    test.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        server = MatchServer(args.host, args.port, args.max_waves)
+        print(f"serving on {args.host}:{args.port}")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    results, elapsed = asyncio.run(load_test(args.matches, args.grid_size, args.timer, args.seed, args.topology))
+    finished = sum(1 for result in results if result["game_over"]) // 2
+    moves = sum(result["moves"] for result in results) // 2
+    desyncs = sum(result["desyncs"] for result in results)
+    print(f"{args.matches} matches over loopback: {finished} finished, {moves} moves in {elapsed:.2f}s "
+          f"({moves / elapsed:.0f} moves/s), {desyncs} desyncs")
+    return 0 if desyncs == 0 and finished == args.matches else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
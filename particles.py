@@ -0,0 +1,86 @@
+import numpy as np
+
+PARTICLE_LIFETIME = 40  # Frames a particle lives at most; alpha fades over this span
+
+
+class ParticlePool:
+    """Fixed-size structure-of-arrays particle system.
+
+    Every particle lives in a slot of parallel NumPy arrays (position,
+    velocity, remaining life, size and color index) that update in one
+    vectorized step per frame. Dead slots are reused by later emits, and
+    once all ``max_particles`` slots are busy new particles are dropped.
+    """
+
+    def __init__(self, max_particles=4000, seed=None):
+        self.max_particles = max_particles
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(max_particles, dtype=np.float32)
+        self.y = np.zeros(max_particles, dtype=np.float32)
+        self.vx = np.zeros(max_particles, dtype=np.float32)
+        self.vy = np.zeros(max_particles, dtype=np.float32)
+        self.life = np.zeros(max_particles, dtype=np.int16)
+        self.size = np.zeros(max_particles, dtype=np.int16)
+        self.color = np.zeros(max_particles, dtype=np.int8)
+        self.alive = np.zeros(max_particles, dtype=bool)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def emit(self, x, y, color, count, max_size=5):
+        """Spawn up to count particles at (x, y) flying out in random directions"""
+        slots = np.flatnonzero(~self.alive)[:count]
+        count = len(slots)
+        if count == 0:
+            return 0
+        angle = self.rng.uniform(0, 2 * np.pi, count)
+        speed = self.rng.uniform(1, 5, count)
+        self.x[slots] = x
+        self.y[slots] = y
+        self.vx[slots] = np.cos(angle) * speed
+        self.vy[slots] = np.sin(angle) * speed
+        self.life[slots] = self.rng.integers(20, PARTICLE_LIFETIME, count, endpoint=True)
+        self.size[slots] = self.rng.integers(3, max_size, count, endpoint=True)
+        self.color[slots] = color
+        self.alive[slots] = True
+        return count
+
+    def update(self):
+        """Move every live particle one frame and retire the expired ones"""
+        alive = self.alive
+        self.x[alive] += self.vx[alive]
+        self.y[alive] += self.vy[alive]
+        self.life[alive] -= 1
+        alive &= self.life > 0
+
+    def bounds(self):
+        """Return (left, top, right, bottom) covering every live particle, or None"""
+        alive = self.alive
+        if not alive.any():
+            return None
+        size = self.size[alive]
+        x = self.x[alive].astype(np.int32)
+        y = self.y[alive].astype(np.int32)
+        return (int((x - size).min()) - 1, int((y - size).min()) - 1,
+                int((x + size).max()) + 2, int((y + size).max()) + 2)
+
+    def shift(self, dx, dy):
+        """Move every particle by (dx, dy), e.g. to follow a scrolling view"""
+        self.x += dx
+        self.y += dy
+
+    def clear(self):
+        self.alive[:] = False
+
+    def draw(self, surface, colors, sprites):
+        """Blit live particles from a SpriteCache; colors maps a color index to an RGB(A) tuple"""
+        slots = np.flatnonzero(self.alive)
+        if len(slots) == 0:
+            return
+        alpha = (255 * self.life[slots] // PARTICLE_LIFETIME).tolist()
+        xs = self.x[slots].astype(np.int32).tolist()
+        ys = self.y[slots].astype(np.int32).tolist()
+        sizes = self.size[slots].tolist()
+        color_index = self.color[slots].tolist()
+        sprites.draw_circles(surface, [(x, y, colors[index], size, a)
+                                       for x, y, size, index, a in zip(xs, ys, sizes, color_index, alpha)])
@@ -0,0 +1,65 @@
+import time
+from resolver import explode_wave
+
+WAVE_MS = 60  # Time per wave for short cascades
+MAX_CASCADE_MS = 1500  # No cascade takes longer than this to play back
+REPLAY_BUDGET_MS = 6  # Most of a frame's time spent re-exploding waves before skipping ahead
+
+
+class CascadePlayback:
+    """Replays an already resolved cascade wave by wave for the view.
+
+    The engine resolves a move's whole chain reaction at once, so the
+    number of waves is known up front. Playback starts from a copy of the
+    board before the first wave and re-explodes one wave at a time on it;
+    ``board`` is the position to show meanwhile.
+
+    Pacing is by elapsed time rather than frames: a cascade gets WAVE_MS
+    per wave, squeezed so the whole playback fits into ``max_time``, and
+    each advance() plays every wave that is due by then. Slow frames thus
+    show several waves at once instead of stretching the cascade out.
+    Re-exploding stops after REPLAY_BUDGET_MS in one frame, and once the
+    time is up the rest is skipped by jumping to ``final``.
+    """
+
+    def __init__(self, board, owner, topology, wave_count, final, max_time=MAX_CASCADE_MS):
+        self.board = board
+        self.owner = owner
+        self.topology = topology
+        self.wave_count = wave_count
+        self.final = final  # The engine's board after the cascade
+        self.played = 0
+        self.candidates = None  # Cells the last wave hit, the only ones the next can explode
+        self.elapsed = 0
+        self.duration = min(wave_count * WAVE_MS, max_time)
+
+    @property
+    def done(self):
+        """Whether every wave has played or the time is up; finish() then shows the end"""
+        return self.played >= self.wave_count or self.elapsed >= self.duration
+
+    def advance(self, dt):
+        """Move on by dt milliseconds and play the waves due by then; returns them in order.
+
+        Wave k is due once (k - 1) / wave_count of the duration has passed,
+        so the first one plays on the call that starts the cascade.
+        """
+        self.elapsed += dt
+        due = max(1, -(-self.elapsed * self.wave_count // self.duration)) if self.duration else self.wave_count
+        waves = []
+        deadline = time.perf_counter() + REPLAY_BUDGET_MS / 1000
+        while self.played < min(due, self.wave_count) and time.perf_counter() < deadline:
+            wave = explode_wave(self.board, self.owner, self.topology, self.candidates)
+            if wave is None:
+                break
+            waves.append(wave)
+            self.candidates = wave.targets
+            self.played += 1
+        return waves
+
+    def finish(self):
+        """Skip to the end of the cascade; returns flat indices of cells that jumped"""
+        cells = self.board.changed_cells(self.final)
+        self.board = self.final
+        self.played = self.wave_count
+        return cells
@@ -0,0 +1,93 @@
+import csv
+import time
+from collections import deque
+import numpy as np
+
+# Frame phases in the order run() goes through them; "wait" is the frame limiter's sleep
+PHASES = ("events", "timers", "explosions", "ai", "orbs", "particles", "draw", "flip", "wait")
+COUNTERS = ("exploded", "live_particles", "blits", "regions")  # Cells exploded, particles alive, sprite blits, dirty regions
+ROLLING_FRAMES = 300  # Frames kept for the rolling percentiles (5 seconds at 60 FPS)
+
+
+class FrameProfiler:
+    """Per-phase frame timings and per-frame counters.
+
+    The game loop calls start_frame(), then mark(phase) as each phase
+    ends, so a phase's time is everything since the previous mark, and
+    end_frame() once the frame is done. The last ROLLING_FRAMES frames
+    feed percentiles(); with ``csv_path`` every frame is also written out
+    as a row of milliseconds and counts. While disabled every call returns
+    at once.
+    """
+
+    def __init__(self, enabled=False, csv_path=None, window=ROLLING_FRAMES):
+        self.enabled = enabled
+        self.frames = deque(maxlen=window)
+        self.frame = 0
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.last = time.perf_counter()
+        self.start = self.last
+        self.file = None
+        self.writer = None
+        if csv_path is not None:
+            self.file = open(csv_path, "w", newline="")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(["frame", "time_ms"] + [f"{phase}_ms" for phase in PHASES] + list(COUNTERS))
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frames.clear()
+        if self.enabled:
+            self.start_frame()  # Time the rest of this frame from now, not from when the profiler was last on
+        return self.enabled
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self.last = time.perf_counter()
+        for phase in PHASES:
+            self.times[phase] = 0.0
+        for counter in COUNTERS:
+            self.counts[counter] = 0
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to phase"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.times[phase] += now - self.last
+        self.last = now
+
+    def count(self, counter, amount=1):
+        if self.enabled:
+            self.counts[counter] += amount
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.frame += 1
+        row = [self.times[phase] * 1000 for phase in PHASES] + [self.counts[counter] for counter in COUNTERS]
+        self.frames.append(row)
+        if self.writer is not None:
+            self.writer.writerow([self.frame, round((self.last - self.start) * 1000, 3)] +
+                                 [round(value, 4) for value in row[:len(PHASES)]] + row[len(PHASES):])
+            if self.frame % 60 == 0:
+                self.file.flush()
+
+    def percentiles(self):
+        """Return {phase or counter: (p50, p99)} over the rolling window, plus "frame" for the busy time"""
+        if not self.frames:
+            return {}
+        frames = np.array(self.frames)
+        p50, p99 = np.percentile(frames, [50, 99], axis=0)
+        stats = {name: (p50[i], p99[i]) for i, name in enumerate(PHASES + COUNTERS)}
+        busy = frames[:, :PHASES.index("wait")].sum(axis=1)  # Everything but the limiter's sleep
+        stats["frame"] = tuple(np.percentile(busy, [50, 99]))
+        return stats
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.writer = None
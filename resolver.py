@@ -0,0 +1,80 @@
+import numpy as np
+from collections import namedtuple
+
+# One wave of a cascade: every cell at or above critical mass explodes at once.
+# exploded/targets are sorted flat cell indices (row * cols + col); counts are the orb counts
+# that exploded and previous_owner/previous_count the targets' cells before the wave.
+Wave = namedtuple("Wave", ["exploded", "counts", "targets", "previous_owner", "previous_count"])
+
+# Outcome of resolve_cascade: the waves played, whether it stopped because the
+# other player was wiped out, and whether it ran out of its wave/explosion budget
+Cascade = namedtuple("Cascade", ["waves", "eliminated", "exhausted"])
+
+SMALL_WAVE = 4  # Waves with fewer exploding cells go cell by cell, below the fixed cost of the array path
+
+
+def explode_wave(board, owner, topology, candidates=None):
+    """Explode every cell at or above critical mass in one step.
+
+    Each exploding cell is emptied and sends one orb to each of its
+    neighbours in ``topology`` (see topology.py), which are captured for
+    ``owner``. Only the flat cell indices in ``candidates`` are checked
+    when given: on a settled board, just the cells a move or the previous
+    wave added orbs to can have become critical. Otherwise the whole board
+    is scanned. Returns the Wave, or None if nothing was critical.
+    """
+    count = board.count.reshape(-1)
+    if candidates is None:
+        cells = np.flatnonzero(count >= topology.degree)
+    else:
+        cells = candidates[count[candidates] >= topology.degree[candidates]]
+    if len(cells) == 0:
+        return None
+
+    if len(cells) < SMALL_WAVE:
+        cells = cells.tolist()
+        counts, targets, previous_owner, previous_count = board.explode_each(
+            cells, [topology.adjacent(*divmod(cell, topology.cols)) for cell in cells], owner)
+        return Wave(np.array(cells, dtype=np.intp), counts, np.array(targets, dtype=np.intp),
+                    previous_owner, previous_count)
+
+    targets, hits = topology.spread(cells)
+    counts, previous_owner, previous_count = board.explode(cells, targets, hits, owner)
+    return Wave(cells, counts, targets, previous_owner, previous_count)
+
+
+def resolve_cascade(board, owner, topology, stop_on_elimination=True,
+                    max_waves=None, max_explosions=None, start=None):
+    """Resolve a whole chain reaction in place, wave by wave.
+
+    With ``stop_on_elimination`` the cascade stops as soon as no other
+    player has an orb left (the game is decided, and a board owned by one
+    player would otherwise explode forever). ``max_waves`` and
+    ``max_explosions`` bound the work done (checked between waves); when
+    either is hit the cascade stops early with critical cells still on the
+    board and is reported as exhausted. ``start`` lists the flat indices
+    of the cells that can explode first (the cell just played); each later
+    wave only checks the cells the one before it hit. Returns a Cascade
+    whose waves can be replayed by an animation layer.
+    """
+    waves = []
+    candidates = None if start is None else np.asarray(start, dtype=np.intp)
+    explosions = 0
+    opponents = stop_on_elimination and has_opponent(board, owner)
+    while True:
+        if ((max_waves is not None and len(waves) >= max_waves) or
+                (max_explosions is not None and explosions >= max_explosions)):
+            return Cascade(waves, False, bool((board.count >= topology.critical).any()))
+        wave = explode_wave(board, owner, topology, candidates)
+        if wave is None:
+            return Cascade(waves, False, False)
+        waves.append(wave)
+        candidates = wave.targets
+        explosions += len(wave.exploded)
+        if opponents and not has_opponent(board, owner):
+            return Cascade(waves, True, False)
+
+
+def has_opponent(board, owner):
+    """Return True if any player other than owner still has orbs"""
+    return int(board.cells[1:].sum()) > int(board.cells[owner])
@@ -0,0 +1,173 @@
+"""Headless self-play tournaments between bot policies, spread over a process pool.
+
+    python selfplay.py --games 200 --players greedy random --grid-size 6 --out results.jsonl
+    python selfplay.py --games 200 --grid-size 6x9 --topology hex
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ai import PLAYERS
+from engine import ChainReactionEngine
+from topology import GRID, TOPOLOGIES, parse_size
+
+RESULT_FIELDS = ["game", "first", "second", "winner", "winner_policy", "moves", "truncated",
+                 "exhausted", "cascades", "max_cascade_waves", "mean_cascade_waves",
+                 "max_cascade_explosions", "timer_left_first", "timer_left_second", "wall_time"]
+
+
+def play_game(game, policies, grid_size, timer, think_time, seed, max_moves, max_waves, topology=GRID):
+    """Play one headless game between two policy names; returns a result dict.
+
+    Turn timers run on a simulated clock advanced by each bot's real
+    thinking time, so timer settings can be tuned from the results.
+    """
+    start = time.perf_counter()
+    now = [0]
+    engine = ChainReactionEngine(grid_size, timer, clock=lambda: now[0], instant=True, max_waves=max_waves,
+                                 topology=topology)
+    bots = [PLAYERS[name](time_limit=think_time, seed=seed * 2 + i) for i, name in enumerate(policies)]
+    cascade_waves = []
+    cascade_explosions = []
+
+    while not engine.game_over and engine.move_count < max_moves:
+        player = engine.current_player
+        think_start = time.perf_counter()
+        row, col = bots[player].choose_move(engine.board, player, engine.move_count,
+                                            engine.player_timers[player], topology)
+        elapsed = int((time.perf_counter() - think_start) * 1000)
+
+        # Charge the thinking time to the player's clock a second at a time
+        while elapsed >= 1000 and not engine.game_over:
+            now[0] += 1000
+            elapsed -= 1000
+            engine.update_timers()
+        now[0] += elapsed
+        if engine.game_over:
+            break
+
+        engine.make_move(row, col)
+        if engine.last_cascade:
+            cascade_waves.append(len(engine.last_cascade))
+            cascade_explosions.append(sum(len(wave.exploded) for wave in engine.last_cascade))
+
+    winner = engine.winner if engine.game_over else None
+    return {
+        "game": game,
+        "first": policies[0],
+        "second": policies[1],
+        "winner": winner,
+        "winner_policy": policies[winner] if winner is not None else None,
+        "moves": engine.move_count,
+        "truncated": not engine.game_over,
+        "exhausted": engine.cascade_exhausted,
+        "cascades": len(cascade_waves),
+        "max_cascade_waves": max(cascade_waves, default=0),
+        "mean_cascade_waves": round(sum(cascade_waves) / len(cascade_waves), 3) if cascade_waves else 0,
+        "max_cascade_explosions": max(cascade_explosions, default=0),
+        "timer_left_first": engine.player_timers[0],
+        "timer_left_second": engine.player_timers[1],
+        "wall_time": round(time.perf_counter() - start, 4),
+    }
+
+
+def wilson_interval(wins, games, z=1.96):
+    """Return the Wilson score interval for a win rate (95% by default)"""
+    if games == 0:
+        return 0.0, 1.0
+    rate = wins / games
+    denominator = 1 + z * z / games
+    center = (rate + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+class ResultWriter:
+    """Streams result dicts to a .jsonl or .csv file as games finish"""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.csv = None
+        if path.endswith(".csv"):
+            self.csv = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, result):
+        if self.csv is not None:
+            self.csv.writerow(result)
+        else:
+            self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def summarize(results, policies):
+    """Return printable lines with win rates and 95% confidence intervals"""
+    games = len(results)
+    lines = [f"{games} games, {policies[0]} vs {policies[1]}"]
+    for index, name in enumerate(policies):
+        label = f"{name} (as player {index + 1})" if policies[0] == policies[1] else name
+        if policies[0] == policies[1]:
+            wins = sum(1 for result in results if result["winner"] == index)
+        else:
+            wins = sum(1 for result in results if result["winner_policy"] == name)
+        low, high = wilson_interval(wins, games)
+        lines.append(f"  {label}: {wins} wins, {wins / max(games, 1):.1%} [95% CI {low:.1%} - {high:.1%}]")
+    draws = sum(1 for result in results if result["winner"] is None)
+    lines.append(f"  draws/unfinished: {draws}")
+    if games:
+        lines.append(f"  mean moves: {sum(r['moves'] for r in results) / games:.1f}, "
+                     f"longest cascade: {max(r['max_cascade_waves'] for r in results)} waves, "
+                     f"mean game time: {sum(r['wall_time'] for r in results) / games:.3f}s")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless self-play games between bot policies.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--players", nargs=2, default=["greedy", "random"], choices=sorted(PLAYERS),
+                        metavar="POLICY", help=f"two of: {', '.join(sorted(PLAYERS))}")
+    parser.add_argument("--grid-size", type=parse_size, default=(8, 8), help="side length or ROWSxCOLS")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default=GRID)
+    parser.add_argument("--timer", type=int, default=60, help="seconds per player")
+    parser.add_argument("--think-time", type=float, default=0.1, help="seconds per move for search bots")
+    parser.add_argument("--max-moves", type=int, default=2000, help="stop unfinished games after this many moves")
+    parser.add_argument("--max-waves", type=int, default=10000, help="cascade budget per move")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--swap", action="store_true", help="alternate which policy moves first")
+    parser.add_argument("--out", help="write per-game results to this .jsonl or .csv file")
+    args = parser.parse_args(argv)
+
+    writer = ResultWriter(args.out) if args.out else None
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = []
+        for game in range(args.games):
+            policies = list(args.players)
+            if args.swap and game % 2:
+                policies.reverse()
+            futures.append(executor.submit(play_game, game, policies, args.grid_size, args.timer,
+                                           args.think_time, args.seed + game, args.max_moves, args.max_waves,
+                                           args.topology))
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if writer is not None:
+                writer.write(result)
+    if writer is not None:
+        writer.close()
+
+    for line in summarize(results, args.players):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
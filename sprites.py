@@ -0,0 +1,76 @@
+import pygame
+from collections import OrderedDict
+from pygame import gfxdraw
+
+ALPHA_BUCKETS = 16  # Alpha is quantized to this many levels so fading sprites share surfaces
+
+
+class SpriteCache:
+    """Pre-rendered anti-aliased circles, blitted instead of rasterized every frame.
+
+    Sprites are keyed by (RGB color, radius, alpha bucket) and rendered
+    once onto a small SRCALPHA surface with the same gfxdraw calls the
+    game used to draw directly.
+    """
+
+    def __init__(self):
+        self.sprites = {}
+        self.blits = 0  # Sprites blitted since the counter was last reset (for profiling)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def circle(self, color, radius, alpha=255):
+        """Return the sprite for a circle; its center is at (radius + 1, radius + 1)"""
+        bucket = alpha * (ALPHA_BUCKETS - 1) // 255
+        key = (color[:3], radius, bucket)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            size = 2 * radius + 3
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            rgba = (*color[:3], bucket * 255 // (ALPHA_BUCKETS - 1))
+            gfxdraw.filled_circle(sprite, radius + 1, radius + 1, radius, rgba)
+            gfxdraw.aacircle(sprite, radius + 1, radius + 1, radius, rgba)
+            self.sprites[key] = sprite
+        return sprite
+
+    def draw_circle(self, surface, x, y, color, radius, alpha=255):
+        """Blit a cached circle centered on (x, y)"""
+        surface.blit(self.circle(color, radius, alpha), (int(x) - radius - 1, int(y) - radius - 1))
+        self.blits += 1
+
+    def draw_circles(self, surface, circles):
+        """Blit many (x, y, color, radius, alpha) circles with one Surface.blits call"""
+        surface.blits([(self.circle(color, radius, alpha), (x - radius - 1, y - radius - 1))
+                       for x, y, color, radius, alpha in circles], doreturn=False)
+        self.blits += len(circles)
+
+    def clear(self):
+        self.sprites.clear()
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color)"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def render(self, font, text, color):
+        """Return font.render(text, True, color), rendering it only on a cache miss"""
+        key = (font, text, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
@@ -0,0 +1,71 @@
+"""Checks that every bot returns a legal move within its time budget."""
+import random
+import time
+import pytest
+from ai import PLAYERS, AIWorker, legal_moves
+from engine import ChainReactionEngine
+from testutil import random_game
+from topology import TOPOLOGIES
+
+TIME_LIMIT = 0.05
+SLACK = 0.2  # Setup, one node past the deadline and a busy test machine
+
+
+def midgame(topology, seed, moves=12):
+    engine = ChainReactionEngine(6, clock=lambda: 0, instant=True, topology=topology)
+    random_game(engine, random.Random(seed), moves)
+    return engine
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+@pytest.mark.parametrize("name", sorted(PLAYERS))
+def test_bot_plays_legal_moves_within_budget(name, topology):
+    bot = PLAYERS[name](time_limit=TIME_LIMIT, seed=0)
+    for seed in range(3):
+        engine = midgame(topology, seed)
+        if engine.game_over:
+            continue
+        player = engine.current_player
+        start = time.perf_counter()
+        move = bot.choose_move(engine.board.copy(), player, engine.move_count, topology=topology)
+        assert time.perf_counter() - start < TIME_LIMIT + SLACK
+        assert move in legal_moves(engine.board, player)
+        assert engine.play(*move)
+
+
+@pytest.mark.parametrize("name", ["minimax", "mcts"])
+def test_search_respects_node_budget_and_clock(name):
+    engine = midgame("grid", 1)
+    bot = PLAYERS[name](time_limit=10, max_nodes=20, seed=0)
+    move = bot.choose_move(engine.board, engine.current_player, engine.move_count)
+    assert bot.nodes <= 20
+    assert move in legal_moves(engine.board, engine.current_player)
+    # A nearly spent clock shortens the think time below the time limit
+    assert bot.think_time(1) == 0.1 and bot.think_time(None) == 10
+
+
+@pytest.mark.parametrize("name", ["greedy", "minimax", "mcts"])
+def test_bot_takes_a_winning_capture(name):
+    """Exploding the corner captures the opponent's only orb"""
+    engine = ChainReactionEngine(3, clock=lambda: 0)
+    engine.play(0, 0)
+    engine.play(0, 1)
+    move = PLAYERS[name](time_limit=0.5, seed=0).choose_move(engine.board, 0, engine.move_count)
+    assert move == (0, 0)
+    assert engine.play(*move)
+    assert engine.game_over and engine.winner == 0
+
+
+def test_worker_returns_a_move():
+    engine = midgame("grid", 2)
+    worker = AIWorker(PLAYERS["greedy"](time_limit=TIME_LIMIT, seed=0))
+    try:
+        worker.request_move(engine.board, engine.current_player, engine.move_count)
+        deadline = time.perf_counter() + 10
+        move = None
+        while move is None and time.perf_counter() < deadline:
+            move = worker.poll()
+            time.sleep(0.01)
+    finally:
+        worker.shutdown(wait=True)
+    assert move in legal_moves(engine.board, engine.current_player)
@@ -0,0 +1,32 @@
+"""Checks that BatchEnv plays each of its games exactly like the instant engine."""
+import numpy as np
+import pytest
+from batch_env import BatchEnv
+from engine import ChainReactionEngine
+from testutil import SHAPE
+from topology import TOPOLOGIES
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_batch_env_matches_instant_engine(topology):
+    games = 8
+    env = BatchEnv(games, SHAPE, topology=topology)
+    engines = [ChainReactionEngine(SHAPE, clock=lambda: 0, instant=True, max_waves=10000, topology=topology)
+               for _ in range(games)]
+    rng = np.random.default_rng(0)
+    cols = SHAPE[1]
+    for _ in range(80):
+        legal = env.legal_moves().reshape(games, -1)
+        actions = np.array([rng.choice(np.flatnonzero(moves)) if moves.any() else 0 for moves in legal])
+        env.step(actions)
+        for game, engine in enumerate(engines):
+            if not engine.game_over:
+                assert engine.play(*divmod(int(actions[game]), cols))
+            assert np.array_equal(env.owner[game], engine.board.owner)
+            assert np.array_equal(env.count[game], engine.board.count)
+            assert env.done[game] == engine.game_over
+            assert env.current_player[game] == engine.current_player
+            if engine.game_over:
+                assert env.winner[game] == (-1 if engine.winner is None else engine.winner)
+        if env.done.all():
+            break
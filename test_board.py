@@ -0,0 +1,27 @@
+"""Checks that the board's running counters and Zobrist hash stay in step with its cells."""
+import pickle
+import random
+import pytest
+from board import Board
+from engine import ChainReactionEngine
+from testutil import SEEDS, SHAPE, assert_counters, random_game
+from topology import TOPOLOGIES
+
+
+@pytest.mark.parametrize("instant", [False, True])
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_counters_and_hash_match_recount(topology, instant):
+    for seed in SEEDS:
+        engine = ChainReactionEngine(SHAPE, clock=lambda: 0, instant=instant, topology=topology)
+        random_game(engine, random.Random(seed), on_move=lambda engine: assert_counters(engine.board))
+
+
+def test_board_pickles_without_key_table():
+    board = Board((6, 5))
+    board.add_orb(2, 3, 1)
+    board.add_orb(0, 0, 2)
+    data = pickle.dumps(board)
+    assert len(data) < board.keys.nbytes
+    copy = pickle.loads(data)
+    assert copy == board and hash(copy) == hash(board)
+    assert copy.keys is board.keys
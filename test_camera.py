@@ -0,0 +1,100 @@
+"""Checks for the viewport geometry: picking, visible ranges, zoom and clamping (no window needed)."""
+import pytest
+from camera import Camera
+
+VIEWPORT = (50, 100, 560, 560)
+
+
+def visible_centers(camera):
+    """Yield every cell whose center is on screen, with that center"""
+    for row in range(camera.rows):
+        for col in range(camera.cols):
+            center = camera.cell_center(row, col)
+            if camera.viewport.collidepoint(center):
+                yield (row, col), center
+
+
+@pytest.mark.parametrize("stagger", [False, True])
+def test_cell_at_finds_every_cell_center_at_any_zoom(stagger):
+    camera = Camera(40, 30, VIEWPORT, 140, stagger)
+    for steps in range(12):
+        camera.zoom(1, (300, 400))
+        camera.pan(37 * steps, 23 * steps)
+        found = 0
+        for cell, center in visible_centers(camera):
+            assert camera.cell_at(center) == cell
+            found += 1
+        assert found
+
+
+@pytest.mark.parametrize("stagger", [False, True])
+def test_cell_at_is_none_outside_the_board(stagger):
+    camera = Camera(3, 4, VIEWPORT, 70, stagger)  # 280 x 210 pixels at most, well inside the viewport
+    left, top = camera.viewport.topleft
+    size = camera.cell_size
+    assert camera.cell_at((left - 1, top + 5)) is None
+    assert camera.cell_at((left + 5, top - 1)) is None
+    assert camera.cell_at((left + 5, top + 3 * size + 1)) is None  # Below the last row
+    assert camera.cell_at((left + 4 * size + size // 2 + 1, top + 5)) is None  # Right of every row
+    assert camera.cell_at(camera.viewport.bottomright) is None
+
+
+def test_cell_at_is_none_in_the_notches_of_a_staggered_board():
+    camera = Camera(3, 4, VIEWPORT, 70, stagger=True)
+    left, top = camera.viewport.topleft
+    size = camera.cell_size
+    # Odd rows start half a cell in, even rows end half a cell early
+    assert camera.cell_at((left + size // 2 - 1, top + size + 5)) is None
+    assert camera.cell_at((left + size // 2, top + size + 5)) == (1, 0)
+    assert camera.cell_at((left + 4 * size + 1, top + 5)) is None
+    assert camera.cell_at((left + 4 * size + 1, top + size + 5)) == (1, 3)
+
+
+@pytest.mark.parametrize("stagger", [False, True])
+def test_visible_cells_cover_every_cell_on_screen(stagger):
+    camera = Camera(50, 45, VIEWPORT, 140, stagger)
+    camera.zoom(6)
+    camera.pan(333, 1000)
+    for rect in (None, (200, 300, 97, 61), (0, 0, 80, 130), (700, 900, 10, 10)):
+        rows, cols = camera.visible_cells(rect)
+        assert 0 <= rows.start and rows.stop <= camera.rows
+        assert 0 <= cols.start and cols.stop <= camera.cols
+        area = camera.viewport if rect is None else camera.viewport.clip(rect)
+        for row in range(camera.rows):
+            for col in range(camera.cols):
+                if camera.cell_rect(row, col).colliderect(area):
+                    assert row in rows and col in cols
+
+
+def test_zoom_keeps_the_cell_under_the_cursor():
+    camera = Camera(64, 64, VIEWPORT, 140)
+    camera.zoom(4)
+    camera.pan(400, 300)
+    cursor = (260, 330)
+    for steps in (1, 1, -1, 2, -3):
+        cell = camera.cell_at(cursor)
+        assert camera.zoom(steps, cursor)
+        assert camera.cell_at(cursor) == cell
+
+
+def test_zoom_and_pan_stay_inside_the_board():
+    camera = Camera(64, 64, VIEWPORT, 140)
+    assert camera.pan(-10, -10) == (0, 0)
+    assert not camera.zoom(-1)  # Already zoomed out to fit the board
+    for _ in range(20):
+        camera.zoom(1, camera.viewport.bottomright)
+    assert camera.cell_size == 140
+    camera.pan(10 ** 6, 10 ** 6)
+    width, height = camera.world_size()
+    assert (camera.x, camera.y) == (width - camera.viewport.width, height - camera.viewport.height)
+    assert camera.cell_at((camera.viewport.right - 1, camera.viewport.bottom - 1)) == (63, 63)
+    assert camera.fit() and (camera.x, camera.y, camera.cell_size) == (0, 0, camera.min_cell_size)
+
+
+def test_board_smaller_than_the_viewport_never_moves():
+    camera = Camera(3, 3, VIEWPORT, 70)
+    assert camera.cell_size == 70
+    assert not camera.zoom(1) and not camera.zoom(-1)
+    assert camera.pan(100, -100) == (0, 0)
+    assert (camera.x, camera.y) == (0, 0) and not camera.fit()
+    assert camera.visible_cells() == (range(0, 3), range(0, 3))
@@ -0,0 +1,72 @@
+"""Checks for the engine's cascade budgets and its undo/redo history."""
+import random
+import pytest
+from engine import ChainReactionEngine
+from testutil import SEEDS, SHAPE, assert_counters, random_game
+from topology import TOPOLOGIES
+
+
+@pytest.mark.parametrize("instant", [False, True])
+def test_endless_cascade_runs_out_of_budget(instant):
+    """Five orbs can never settle on a 2x2 board, so only the budget ends the chain reaction"""
+    engine = ChainReactionEngine(2, clock=lambda: 0, instant=instant, stop_on_elimination=False,
+                                 max_waves=50, max_explosions=50)
+    for row, col in ((0, 0), (0, 1), (1, 0), (1, 1)):
+        engine.board.add_orb(row, col, 1)
+    assert engine.play(0, 0)
+    assert engine.cascade_exhausted
+    assert engine.game_over and engine.winner is None
+    assert not engine.processing_explosions
+
+
+def test_process_explosions_limit_spreads_a_cascade():
+    engine = ChainReactionEngine(3, clock=lambda: 0)
+    engine.board.add_orb(0, 0, 1)
+    engine.board.add_orb(0, 1, 1)
+    engine.board.add_orb(0, 1, 1)
+    assert engine.make_move(0, 0)
+    assert [cell[:2] for cell in engine.process_explosions(limit=1)] == [(0, 0)]
+    assert engine.processing_explosions and engine.current_player == 0
+    assert [cell[:2] for cell in engine.process_explosions(limit=1)] == [(0, 1)]
+    assert not engine.processing_explosions and engine.current_player == 1
+
+
+@pytest.mark.parametrize("instant", [False, True])
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_undo_redo_round_trip(topology, instant):
+    for seed in SEEDS:
+        engine = ChainReactionEngine(SHAPE, clock=lambda: 0, instant=instant, topology=topology)
+        snapshots = [engine.snapshot()]
+        random_game(engine, random.Random(seed), on_move=lambda engine: snapshots.append(engine.snapshot()))
+        final = snapshots[-1]
+
+        for expected in reversed(snapshots[:-1]):
+            assert engine.undo()
+            assert engine.snapshot() == expected
+            assert_counters(engine.board)
+        assert not engine.undo()
+
+        for expected in snapshots[1:]:
+            assert engine.redo()
+            assert engine.snapshot() == expected
+        assert not engine.redo()
+        assert engine.snapshot() == final
+
+
+def test_no_undo_after_timeout_or_resignation():
+    now = [0]
+    engine = ChainReactionEngine(4, timer=3, clock=lambda: now[0])
+    engine.play(0, 0)
+    engine.play(3, 3)
+    for _ in range(3):
+        now[0] += 1000
+        engine.update_timers()
+    assert engine.game_over and engine.winner == 1
+    assert not engine.undo()
+    assert engine.game_over and engine.player_timers == [0, 3]
+
+    engine = ChainReactionEngine(4, clock=lambda: 0)
+    engine.play(0, 0)
+    assert engine.resign(1)
+    assert not engine.undo()
+    assert engine.game_over and engine.winner == 0
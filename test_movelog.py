@@ -0,0 +1,71 @@
+"""Checks that recorded move logs replay to the positions and clocks of the live game."""
+import random
+import pytest
+from engine import ChainReactionEngine
+from movelog import MoveLog, MoveRecorder, Replay, main
+from testutil import SHAPE, legal_moves
+from topology import TOPOLOGIES
+
+
+@pytest.mark.parametrize("instant", [False, True])
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_move_log_seek_matches_live_game(tmp_path, topology, instant):
+    now = [0]
+    rng = random.Random(7)
+    engine = ChainReactionEngine(SHAPE, timer=30, clock=lambda: now[0], instant=instant, topology=topology)
+    path = tmp_path / "match.aslog"
+    engine.recorder = MoveRecorder(path, engine, keyframe_interval=8)
+    snapshots = [engine.snapshot()]
+    while not engine.game_over and engine.move_count < 100:
+        now[0] += rng.randint(0, 1500)
+        engine.update_timers()
+        if engine.game_over:
+            break
+        if engine.redo_stack and rng.random() < 0.5:
+            # Redo after the clock has run while the move was taken back
+            assert engine.redo()
+        else:
+            engine.play(*rng.choice(legal_moves(engine)))
+        snapshots.append(engine.snapshot())
+        if rng.random() < 0.1 and len(snapshots) > 2:
+            assert engine.undo()
+            snapshots.pop()
+    engine.recorder.close(engine)
+
+    log = MoveLog.read(path)
+    assert len(log) == len(snapshots) - 1
+    assert log.keyframes
+    replay = Replay(log)
+    for index, expected in enumerate(snapshots):
+        state = replay.seek(index).snapshot()
+        assert state.board == expected.board
+        assert state.current_player == expected.current_player
+        assert state.player_timers == expected.player_timers
+    assert replay.seek(len(log)).winner == engine.winner
+
+
+def test_move_log_rejects_takeback_without_move(tmp_path):
+    engine = ChainReactionEngine(4, clock=lambda: 0)
+    path = tmp_path / "bad.aslog"
+    recorder = MoveRecorder(path, engine)
+    recorder.undo(engine)
+    recorder.close()
+    with pytest.raises(ValueError, match="corrupt move log"):
+        MoveLog.read(path)
+
+
+def test_main_rejects_moves_past_the_end(tmp_path, capsys):
+    engine = ChainReactionEngine(4, clock=lambda: 0)
+    path = tmp_path / "short.aslog"
+    engine.recorder = MoveRecorder(path, engine)
+    engine.play(0, 0)
+    engine.play(3, 3)
+    engine.recorder.close(engine)
+
+    assert main([str(path), "--move", "2"]) == 0
+    assert "after move 2: player 1 to move" in capsys.readouterr().out
+    for move in ("999", "-1"):
+        with pytest.raises(SystemExit) as exit_info:
+            main([str(path), "--move", move])
+        assert exit_info.value.code == 2
+        assert "--move must be between 0 and 2" in capsys.readouterr().err
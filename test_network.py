@@ -0,0 +1,80 @@
+"""Checks for the match server: loopback games, refused moves and the diffs clients mirror."""
+import asyncio
+import json
+import random
+import numpy as np
+import pytest
+from board import Board
+from engine import ChainReactionEngine
+from network import Match, MatchServer, encode, load_test
+from testutil import SHAPE, random_game
+from topology import TOPOLOGIES
+
+
+class FakeConnection:
+    """Collects what a Match sends instead of writing it to a socket"""
+
+    def __init__(self, name):
+        self.name = name
+        self.match = None
+        self.player = None
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_load_test_over_loopback_has_no_desyncs(topology):
+    results, _ = asyncio.run(load_test(3, (5, 6), 60, seed=0, topology=topology))
+    assert len(results) == 6
+    assert all(result["game_over"] for result in results)
+    assert sum(result["desyncs"] for result in results) == 0
+
+
+def test_match_refuses_bad_moves():
+    async def play():
+        connections = [FakeConnection("a"), FakeConnection("b")]
+        match = Match(1, connections, 4, 60, None)
+        match.start()
+        refusals = [match.move(1, 0, 0), match.move(0, True, 0), match.move(0, 0, False),
+                    match.move(0, "0", 0), match.move(0, 4, 0)]
+        accepted = match.move(0, 1, 1)
+        match.stop_clock()
+        return refusals, accepted, match.engine
+
+    refusals, accepted, engine = asyncio.run(play())
+    assert refusals == ["not your turn"] + ["illegal move"] * 4
+    assert accepted is None
+    assert engine.move_count == 1 and engine.board.cell(1, 1) == (1, 1)
+
+
+def test_history_off_keeps_last_changed_only():
+    """last_changed alone must be enough to mirror a game, as the server relies on"""
+    engine = ChainReactionEngine(SHAPE, clock=lambda: 0, instant=True, history=False)
+    mirror = Board(SHAPE)
+
+    def check(engine):
+        changed = engine.last_changed
+        assert np.isin(mirror.changed_cells(engine.board), changed).all()
+        mirror.set_cells(changed, engine.board.owner.flat[changed], engine.board.count.flat[changed])
+        assert mirror == engine.board and mirror.zobrist == engine.board.zobrist
+
+    random_game(engine, random.Random(1), on_move=check)
+    assert engine.undo_stack == [] and not engine.undo()
+
+
+@pytest.mark.parametrize("join", [{"grid_size": 1e400}, {"timer": 1e400}, {"grid_size": [6, 1e400]},
+                                  {"grid_size": 8.0}, {"timer": True}, {"grid_size": "8"}, {"grid_size": [6]}])
+def test_server_rejects_bad_joins(join):
+    async def send_join():
+        server = MatchServer("127.0.0.1", 0)
+        port = await server.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(encode({"type": "join", "name": "a", **join}))
+        reply = json.loads(await reader.readline())
+        writer.close()
+        server.close()
+        return reply
+
+    assert asyncio.run(send_join()) == {"type": "error", "message": "grid size or timer out of range"}
@@ -0,0 +1,38 @@
+"""Checks for the particle pool's cap and slot reuse."""
+import numpy as np
+from particles import PARTICLE_LIFETIME, ParticlePool
+
+
+def test_emit_stops_at_the_cap():
+    pool = ParticlePool(10, seed=0)
+    assert pool.emit(5, 5, 0, 6) == 6
+    assert pool.emit(5, 5, 1, 6) == 4  # Only four slots were left
+    assert len(pool) == 10
+    assert pool.emit(5, 5, 1, 6) == 0
+    assert np.count_nonzero(pool.color == 1) == 4
+
+
+def test_expired_particles_free_their_slots():
+    pool = ParticlePool(8, seed=0)
+    pool.emit(0, 0, 0, 8)
+    x, y = pool.x.copy(), pool.y.copy()
+    pool.update()
+    assert np.allclose(pool.x, x + pool.vx) and np.allclose(pool.y, y + pool.vy)
+    for _ in range(PARTICLE_LIFETIME):
+        pool.update()
+    assert len(pool) == 0 and pool.bounds() is None
+
+    assert pool.emit(50, 60, 1, 3) == 3
+    assert len(pool) == 3
+    left, top, right, bottom = pool.bounds()
+    assert left < 50 < right and top < 60 < bottom
+
+
+def test_dead_slots_are_reused_first_come():
+    pool = ParticlePool(4, seed=0)
+    pool.emit(0, 0, 0, 4)
+    pool.life[[1, 3]] = 1  # Two particles on their last frame
+    pool.update()
+    assert pool.alive.tolist() == [True, False, True, False]
+    assert pool.emit(0, 0, 1, 5) == 2
+    assert pool.alive.all() and pool.color.tolist() == [0, 1, 0, 1]
@@ -0,0 +1,62 @@
+"""Checks the time-based pacing of cascade playback."""
+import random
+from engine import ChainReactionEngine
+from playback import WAVE_MS, CascadePlayback
+from testutil import SHAPE, legal_moves
+
+
+def long_cascade(min_waves=4):
+    """Return (board before the first wave, mover, engine) for the first seeded move with a long cascade"""
+    engine = ChainReactionEngine(SHAPE, clock=lambda: 0, instant=True)
+    rng = random.Random(3)
+    while not engine.game_over:
+        row, col = rng.choice(legal_moves(engine))
+        player = engine.current_player
+        board = engine.board.copy()
+        board.add_orb(row, col, player + 1)
+        engine.play(row, col)
+        if len(engine.last_cascade) >= min_waves:
+            return board, player, engine
+    raise AssertionError("no long cascade in the seeded game")
+
+
+def test_one_wave_per_wave_time():
+    board, player, engine = long_cascade()
+    waves = len(engine.last_cascade)
+    playback = CascadePlayback(board, player + 1, engine.topology, waves, engine.board)
+    assert len(playback.advance(1)) == 1  # The first wave plays on the frame that starts the cascade
+    for played in range(2, waves + 1):
+        assert not playback.done
+        assert len(playback.advance(WAVE_MS)) == 1
+        assert playback.played == played
+    assert playback.done
+    assert playback.board == engine.board
+
+
+def test_slow_frames_play_several_waves():
+    board, player, engine = long_cascade()
+    waves = len(engine.last_cascade)
+    playback = CascadePlayback(board, player + 1, engine.topology, waves, engine.board)
+    playback.advance(1)
+    assert len(playback.advance(2 * WAVE_MS)) == 2
+    assert len(playback.advance(waves * WAVE_MS)) == waves - 3
+    assert playback.done and playback.board == engine.board
+
+
+def test_long_cascades_are_squeezed_and_skipped():
+    board, player, engine = long_cascade()
+    waves = len(engine.last_cascade)
+    playback = CascadePlayback(board.copy(), player + 1, engine.topology, waves, engine.board, max_time=WAVE_MS)
+    assert playback.duration == WAVE_MS
+    assert len(playback.advance(0)) == 1
+    assert not playback.done
+    playback.advance(WAVE_MS)
+    assert playback.done
+
+    # Skipping ahead jumps to the engine's board from wherever playback got to
+    playback = CascadePlayback(board, player + 1, engine.topology, waves, engine.board)
+    playback.advance(0)
+    shown = playback.board.copy()
+    cells = playback.finish()
+    assert playback.board is engine.board and playback.played == waves and playback.done
+    assert cells.tolist() == shown.changed_cells(engine.board).tolist() and len(cells)
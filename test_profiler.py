@@ -0,0 +1,92 @@
+"""Checks the frame profiler's phase accounting, percentiles and CSV trace against a fake clock."""
+import csv
+import types
+import pytest
+import profiler
+from profiler import COUNTERS, PHASES, FrameProfiler
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A perf_counter that only moves when the test advances it (in milliseconds)"""
+    now = [10.0]
+    monkeypatch.setattr(profiler, "time", types.SimpleNamespace(perf_counter=lambda: now[0]))
+
+    def advance(ms):
+        now[0] += ms / 1000
+    return advance
+
+
+def play_frame(frame_profiler, clock, ms_per_phase, exploded=0):
+    frame_profiler.start_frame()
+    for phase, ms in zip(PHASES, ms_per_phase):
+        clock(ms)
+        frame_profiler.mark(phase)
+    frame_profiler.count("exploded", exploded)
+    frame_profiler.count("regions")
+    frame_profiler.end_frame()
+
+
+def test_marks_charge_the_time_since_the_previous_mark(clock):
+    frame_profiler = FrameProfiler(enabled=True)
+    frame_profiler.start_frame()
+    clock(2)
+    frame_profiler.mark("events")
+    clock(3)
+    frame_profiler.mark("draw")
+    clock(1)
+    frame_profiler.mark("events")  # A second mark of a phase adds to it
+    assert frame_profiler.times["events"] == pytest.approx(0.003)
+    assert frame_profiler.times["draw"] == pytest.approx(0.003)
+    frame_profiler.end_frame()
+    assert frame_profiler.frame == 1
+
+    frame_profiler.start_frame()  # Every frame starts from zero
+    assert set(frame_profiler.times.values()) == {0.0} and set(frame_profiler.counts.values()) == {0}
+
+
+def test_disabled_profiler_records_nothing(clock):
+    frame_profiler = FrameProfiler()
+    play_frame(frame_profiler, clock, [1] * len(PHASES), exploded=5)
+    assert frame_profiler.frame == 0 and not frame_profiler.frames and frame_profiler.percentiles() == {}
+
+    clock(500)
+    assert frame_profiler.toggle()
+    clock(1)
+    frame_profiler.mark("events")  # Timed from the toggle, not from the last frame seen while disabled
+    assert frame_profiler.times["events"] == pytest.approx(0.001)
+
+
+def test_percentiles_cover_every_phase_and_counter(clock):
+    frame_profiler = FrameProfiler(enabled=True, window=100)
+    for frame in range(150):  # The first 50 fall out of the window
+        ms = 100 if frame < 50 else frame - 49
+        play_frame(frame_profiler, clock, [ms] + [1] * (len(PHASES) - 2) + [10], exploded=frame)
+    stats = frame_profiler.percentiles()
+    assert set(stats) == set(PHASES) | set(COUNTERS) | {"frame"}
+    assert stats["events"][0] == pytest.approx(50.5) and stats["events"][1] == pytest.approx(99.01)
+    assert stats["draw"] == pytest.approx((1, 1))
+    assert stats["wait"] == pytest.approx((10, 10))
+    assert stats["exploded"][0] == pytest.approx(99.5)
+    assert stats["regions"] == (1, 1)
+    # The frame's busy time leaves out the limiter's wait
+    assert stats["frame"][0] == pytest.approx(50.5 + len(PHASES) - 2)
+
+
+def test_csv_rows(tmp_path, clock):
+    path = tmp_path / "frames.csv"
+    frame_profiler = FrameProfiler(enabled=True, csv_path=str(path))
+    play_frame(frame_profiler, clock, range(1, len(PHASES) + 1), exploded=7)
+    play_frame(frame_profiler, clock, [2] * len(PHASES))
+    frame_profiler.close()
+
+    with open(path, newline="") as file:
+        header, *rows = list(csv.reader(file))
+    assert header == ["frame", "time_ms"] + [f"{phase}_ms" for phase in PHASES] + list(COUNTERS)
+    assert len(rows) == 2
+    first = rows[0]
+    assert first[0] == "1" and float(first[1]) == pytest.approx(sum(range(1, len(PHASES) + 1)))
+    assert [float(value) for value in first[2:2 + len(PHASES)]] == pytest.approx(range(1, len(PHASES) + 1))
+    assert dict(zip(COUNTERS, map(int, first[2 + len(PHASES):]))) == {"exploded": 7, "live_particles": 0,
+                                                                        "blits": 0, "regions": 1}
+    assert rows[1][0] == "2"
@@ -0,0 +1,54 @@
+"""Checks for the vectorized wave resolver against the board it explodes."""
+import random
+import numpy as np
+import pytest
+from board import Board
+from engine import ChainReactionEngine
+from resolver import explode_wave, has_opponent, resolve_cascade
+from testutil import SEEDS, SHAPE, legal_moves
+from topology import TOPOLOGIES, get_topology
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_wave_frontier_matches_full_scan(topology):
+    """Checking only the cells the last wave hit must give the same waves as rescanning the board"""
+
+    def full_scan(board, owner, topology):
+        waves = []
+        opponents = has_opponent(board, owner)
+        while True:
+            wave = explode_wave(board, owner, topology)
+            if wave is None:
+                return waves
+            waves.append(wave)
+            if opponents and not has_opponent(board, owner):
+                return waves
+
+    for seed in SEEDS:
+        engine = ChainReactionEngine(SHAPE, clock=lambda: 0, instant=True, topology=topology)
+        rng = random.Random(seed)
+        while not engine.game_over and engine.move_count < 80:
+            row, col = rng.choice(legal_moves(engine))
+            owner = engine.current_player + 1
+            board = engine.board.copy()
+            board.add_orb(row, col, owner)
+            engine.play(row, col)
+
+            waves = full_scan(board, owner, engine.topology)
+            assert len(waves) == len(engine.last_cascade)
+            for expected, actual in zip(waves, engine.last_cascade):
+                for expected_field, actual_field in zip(expected, actual):
+                    assert np.array_equal(expected_field, actual_field)
+            assert board == engine.board and board.zobrist == engine.board.zobrist
+
+
+def test_resolve_cascade_from_start_cell():
+    topology = get_topology(3)
+    board = Board(3)
+    board.add_orb(0, 0, 1)
+    board.add_orb(0, 0, 1)
+    cascade = resolve_cascade(board, 1, topology, start=[0])
+    assert len(cascade.waves) == 1
+    assert cascade.waves[0].exploded.tolist() == [0]
+    assert cascade.waves[0].targets.tolist() == [1, 3]
+    assert board.cell(0, 0) == (0, 0) and board.cell(0, 1) == (1, 1) and board.cell(1, 0) == (1, 1)
@@ -0,0 +1,69 @@
+"""Checks for the headless rules: run the suite with python -m pytest.
+
+Games are random but seeded (see testutil.py); the other test modules
+cover every topology and both cascade modes.
+"""
+import subprocess
+import sys
+import pytest
+from engine import ChainReactionEngine
+
+
+def test_engine_runs_without_pygame():
+    code = "import sys, engine, movelog, network, selfplay; sys.exit('pygame' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_critical_mass_is_the_number_of_neighbours():
+    engine = ChainReactionEngine(4, clock=lambda: 0)
+    assert engine.get_critical_mass(0, 0) == 2
+    assert engine.get_critical_mass(0, 2) == 3
+    assert engine.get_critical_mass(2, 1) == 4
+
+
+def test_moves_are_only_legal_on_empty_or_own_cells():
+    engine = ChainReactionEngine(4, clock=lambda: 0)
+    assert engine.play(1, 1)
+    assert not engine.play(1, 1)  # Player 2 can't add to player 1's cell
+    assert not engine.play(4, 0) and not engine.play(0, -1)
+    assert engine.current_player == 1 and engine.move_count == 1
+    assert engine.play(2, 2)
+    assert engine.play(1, 1)
+    assert engine.board.cell(1, 1) == (1, 2)
+
+
+@pytest.mark.parametrize("instant", [False, True])
+def test_explosion_captures_neighbours_and_wins(instant):
+    engine = ChainReactionEngine(3, clock=lambda: 0, instant=instant)
+    engine.play(0, 0)
+    engine.play(0, 1)
+    assert not engine.game_over
+    engine.play(0, 0)  # The corner reaches two orbs and takes over the blue edge cell
+    assert engine.board.cell(0, 0) == (0, 0)
+    assert engine.board.cell(0, 1) == (1, 2) and engine.board.cell(1, 0) == (1, 1)
+    assert engine.game_over and engine.winner == 0
+    assert engine.cell_count(0) == 2 and engine.orb_count(0) == 3 and engine.cell_count(1) == 0
+
+
+def test_no_winner_before_both_players_have_moved():
+    engine = ChainReactionEngine(3, clock=lambda: 0)
+    engine.play(0, 0)
+    assert not engine.game_over and engine.current_player == 1
+
+
+def test_timer_counts_down_the_player_to_move():
+    now = [0]
+    engine = ChainReactionEngine(4, timer=2, clock=lambda: now[0])
+    now[0] += 999
+    engine.update_timers()
+    assert engine.player_timers == [2, 2]
+    now[0] += 1
+    engine.update_timers()
+    assert engine.player_timers == [1, 2]
+    engine.play(0, 0)
+    now[0] += 1000
+    engine.update_timers()
+    assert engine.player_timers == [1, 1]
+    now[0] += 1000
+    engine.update_timers()
+    assert engine.game_over and engine.winner == 0 and engine.forfeited
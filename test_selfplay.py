@@ -0,0 +1,91 @@
+"""Checks for the self-play runner: game records, confidence intervals, summaries and output files."""
+import csv
+import json
+import subprocess
+import sys
+import pytest
+from selfplay import RESULT_FIELDS, ResultWriter, main, play_game, summarize, wilson_interval
+
+
+def result(game, policies, winner, moves=10, waves=0):
+    """A minimal result record, as play_game returns it"""
+    record = dict.fromkeys(RESULT_FIELDS, 0)
+    record.update(game=game, first=policies[0], second=policies[1], winner=winner, moves=moves,
+                  winner_policy=None if winner is None else policies[winner], max_cascade_waves=waves)
+    return record
+
+
+def test_launcher_never_imports_pygame():
+    """Spawned pool workers re-import the launcher as their main module"""
+    code = "import sys, atomic_splitter; sys.exit('pygame' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+@pytest.mark.parametrize("wins, games, low, high", [(5, 10, 0.2366, 0.7634), (0, 10, 0.0, 0.2775),
+                                                    (10, 10, 0.7225, 1.0), (2, 2, 0.3424, 1.0)])
+def test_wilson_interval_known_bounds(wins, games, low, high):
+    assert wilson_interval(wins, games) == pytest.approx((low, high), abs=1e-4)
+
+
+def test_wilson_interval_without_games():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_play_game_returns_a_full_record():
+    record = play_game(3, ["greedy", "random"], (4, 5), 60, 0.01, seed=1, max_moves=200, max_waves=1000)
+    assert list(record) == RESULT_FIELDS
+    assert record["game"] == 3 and record["first"] == "greedy" and record["second"] == "random"
+    assert record["moves"] > 0 and not record["truncated"]
+    assert record["winner_policy"] == ["greedy", "random"][record["winner"]]
+    assert record["cascades"] > 0 and record["max_cascade_waves"] >= record["mean_cascade_waves"] > 0
+
+
+def test_play_game_truncates_at_max_moves():
+    record = play_game(0, ["random", "random"], 6, 60, 0.01, seed=0, max_moves=3, max_waves=1000)
+    assert record["truncated"] and record["winner"] is None and record["moves"] == 3
+
+
+def test_summarize_counts_wins_by_policy_when_swapped():
+    """With --swap the policies alternate seats, so wins are counted by policy name"""
+    results = [result(0, ["greedy", "random"], 0), result(1, ["random", "greedy"], 1),
+               result(2, ["greedy", "random"], 1), result(3, ["random", "greedy"], None, waves=7)]
+    lines = summarize(results, ["greedy", "random"])
+    assert lines[0] == "4 games, greedy vs random"
+    assert lines[1].startswith("  greedy: 2 wins, 50.0% [95% CI")
+    assert lines[2].startswith("  random: 1 wins, 25.0% [95% CI")
+    assert lines[3] == "  draws/unfinished: 1"
+    assert "longest cascade: 7 waves" in lines[4]
+
+
+def test_summarize_counts_wins_by_seat_for_the_same_policy():
+    results = [result(0, ["mcts", "mcts"], 0), result(1, ["mcts", "mcts"], 0), result(2, ["mcts", "mcts"], 1)]
+    lines = summarize(results, ["mcts", "mcts"])
+    assert lines[1].startswith("  mcts (as player 1): 2 wins")
+    assert lines[2].startswith("  mcts (as player 2): 1 wins")
+
+
+def test_summarize_without_games():
+    assert summarize([], ["greedy", "random"])[-1] == "  draws/unfinished: 0"
+
+
+def test_result_writer_jsonl(tmp_path):
+    path = tmp_path / "results.jsonl"
+    writer = ResultWriter(str(path))
+    records = [result(0, ["greedy", "random"], 0), result(1, ["greedy", "random"], None)]
+    for record in records:
+        writer.write(record)
+    writer.close()
+    assert [json.loads(line) for line in path.read_text().splitlines()] == records
+
+
+def test_main_writes_csv(tmp_path, capsys):
+    path = tmp_path / "results.csv"
+    assert main(["--games", "2", "--workers", "1", "--grid-size", "4", "--think-time", "0.01",
+                 "--swap", "--out", str(path)]) == 0
+    with open(path, newline="") as file:
+        reader = csv.DictReader(file)
+        rows = list(reader)
+    assert reader.fieldnames == RESULT_FIELDS
+    assert sorted(int(row["game"]) for row in rows) == [0, 1]
+    assert {(row["first"], row["second"]) for row in rows} == {("greedy", "random"), ("random", "greedy")}
+    assert capsys.readouterr().out.startswith("2 games, greedy vs random")
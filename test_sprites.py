@@ -0,0 +1,40 @@
+"""Checks the rendered-text cache's LRU behaviour with a stand-in font."""
+from sprites import TextCache
+
+
+class CountingFont:
+    """Stands in for a pygame font: render returns a fresh object and counts the calls"""
+
+    def __init__(self):
+        self.rendered = []
+
+    def render(self, text, antialias, color):
+        self.rendered.append(text)
+        return object()
+
+
+def test_hits_reuse_the_rendered_surface():
+    font = CountingFont()
+    cache = TextCache()
+    surface = cache.render(font, "Player 1", (255, 0, 0))
+    assert cache.render(font, "Player 1", [255, 0, 0]) is surface  # Colors as lists share the key
+    assert cache.render(font, "Player 1", (0, 0, 255)) is not surface
+    assert cache.render(CountingFont(), "Player 1", (255, 0, 0)) is not surface
+    assert font.rendered == ["Player 1", "Player 1"] and len(cache) == 3
+
+
+def test_evicts_least_recently_used():
+    font = CountingFont()
+    cache = TextCache(max_entries=2)
+    first = cache.render(font, "a", (0, 0, 0))
+    cache.render(font, "b", (0, 0, 0))
+    assert cache.render(font, "a", (0, 0, 0)) is first  # The hit makes "b" the oldest
+    cache.render(font, "c", (0, 0, 0))
+    assert len(cache) == 2
+    assert cache.render(font, "a", (0, 0, 0)) is first
+    cache.render(font, "b", (0, 0, 0))
+    assert font.rendered == ["a", "b", "c", "b"]
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.render(font, "a", (0, 0, 0)) is not first
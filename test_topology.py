@@ -0,0 +1,19 @@
+"""Checks for the shared neighbour and critical-mass tables."""
+from topology import get_topology
+
+
+def test_shared_tables_are_read_only():
+    topology = get_topology(4)
+    for table in (topology.critical, topology.degree, topology.neighbours):
+        assert not table.flags.writeable
+
+
+def test_big_boards_keep_no_adjacency_cache():
+    small, big = get_topology(8, 8, "hex"), get_topology(128, 128, "hex")
+    assert small.adjacent(3, 4) is small.adjacent(3, 4)
+    assert big.adjacent_cells is None
+    for row, col in ((0, 0), (5, 7), (127, 127)):
+        cell = row * big.cols + col
+        expected = big.neighbours[cell, :big.degree[cell]].tolist()
+        assert [target for _, _, target in big.adjacent(row, col)] == expected
+        assert all(target == r * big.cols + c for r, c, target in big.adjacent(row, col))
@@ -0,0 +1,41 @@
+"""Checks for the transposition table and the engine's use of it."""
+import random
+import pytest
+from engine import ChainReactionEngine
+from testutil import SEEDS, SHAPE, random_game
+from topology import TOPOLOGIES
+from transposition import TranspositionTable
+
+
+def test_table_evicts_least_recently_used():
+    table = TranspositionTable(capacity=2)
+    table.put("a", 1)
+    table.put("b", 2)
+    assert table.get("a") == 1  # "b" is now the oldest
+    table.put("c", 3)
+    assert len(table) == 2
+    assert table.get("b") is None
+    assert table.get("a") == 1 and table.get("c") == 3
+    assert (table.hits, table.misses) == (3, 1)
+
+    table.put("a", 4)  # Storing again refreshes an entry instead of adding one
+    table.put("d", 5)
+    assert len(table) == 2 and table.get("c") is None and table.get("a") == 4
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_cached_cascades_match_resolved_ones(topology):
+    """Games played through a small shared table must end up exactly where uncached ones do"""
+    table = TranspositionTable(capacity=64)
+    for seed in SEEDS:
+        for _ in range(2):  # The second pass hits the table for positions the first one stored
+            plain = ChainReactionEngine(SHAPE, clock=lambda: 0, instant=True, topology=topology)
+            expected = []
+            random_game(plain, random.Random(seed), on_move=lambda engine: expected.append(engine.snapshot()))
+
+            cached = ChainReactionEngine(SHAPE, clock=lambda: 0, instant=True, topology=topology,
+                                         transpositions=table)
+            states = []
+            random_game(cached, random.Random(seed), on_move=lambda engine: states.append(engine.snapshot()))
+            assert states == expected
+    assert table.hits and len(table) <= 64
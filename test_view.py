@@ -0,0 +1,48 @@
+"""Checks that dirty-rectangle drawing leaves the same pixels as a full redraw, on a dummy SDL display."""
+import os
+import random
+import pytest
+
+# No window or sound card needed; the drivers must be chosen before SDL starts
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame
+import view
+from testutil import legal_moves
+from topology import TOPOLOGIES
+
+
+@pytest.fixture
+def frozen_electrons(monkeypatch):
+    """Stop the wall-clock electron rotation, which would differ between two draws of one frame"""
+    monkeypatch.setattr(view, "electron_step", lambda: 0)
+
+
+def assert_matches_full_redraw(game):
+    drawn = pygame.image.tobytes(game.screen, "RGB")
+    game.full_redraw = True
+    game.draw()
+    assert drawn == pygame.image.tobytes(game.screen, "RGB")
+
+
+@pytest.mark.parametrize("grid_size, zoom", [(6, 0), ((12, 16), 3)])
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_dirty_rects_match_full_redraw(frozen_electrons, topology, grid_size, zoom):
+    game = view.ChainReactionGame(grid_size=grid_size, topology=topology)
+    rng = random.Random(5)
+    if zoom:
+        game.zoom(zoom)
+    game.draw()
+    for frame in range(80):
+        engine = game.engine
+        if engine.game_over:
+            break
+        if game.playback is None and frame % 2 == 0:
+            game.make_move(*rng.choice(legal_moves(engine)))
+        if frame % 7 == 0:
+            game.hovered_cell = (rng.randrange(engine.rows), rng.randrange(engine.cols))
+        if zoom and frame % 40 == 20:
+            game.pan(rng.randint(-80, 80), rng.randint(-80, 80))
+        game.update()
+        game.draw()
+        assert_matches_full_redraw(game)
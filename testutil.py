@@ -0,0 +1,28 @@
+"""Seeded game helpers shared by the test modules."""
+
+SHAPE = (5, 6)
+SEEDS = range(6)
+
+
+def legal_moves(engine):
+    """Return the (row, col) moves open to the player to move, in row-major order"""
+    return [(row, col) for row in range(engine.rows) for col in range(engine.cols) if engine.is_valid_move(row, col)]
+
+
+def random_game(engine, rng, moves=80, on_move=None):
+    """Play random legal moves until the game ends or moves run out, calling on_move after each one"""
+    for _ in range(moves):
+        if engine.game_over:
+            break
+        engine.play(*rng.choice(legal_moves(engine)))
+        if on_move is not None:
+            on_move(engine)
+
+
+def assert_counters(board):
+    """The running totals and hash must match a full recount"""
+    fresh = board.copy()
+    fresh.recount()
+    assert fresh.cells.tolist() == board.cells.tolist()
+    assert fresh.orbs.tolist() == board.orbs.tolist()
+    assert fresh.zobrist == board.zobrist
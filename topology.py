@@ -0,0 +1,140 @@
+import numpy as np
+from functools import lru_cache
+
+GRID = "grid"
+TORUS = "torus"  # Edges wrap around, so every cell has four neighbours
+HEX = "hex"  # Odd rows are shifted half a cell right, giving each cell up to six neighbours
+TOPOLOGIES = (GRID, TORUS, HEX)
+ADJACENT_CACHE_CELLS = 4096  # Boards up to this many cells keep each cell's neighbour tuples once built
+
+# Neighbour (row, col) offsets for cells on even and odd rows
+OFFSETS = {
+    GRID: ([(-1, 0), (1, 0), (0, -1), (0, 1)],) * 2,
+    TORUS: ([(-1, 0), (1, 0), (0, -1), (0, 1)],) * 2,
+    HEX: ([(0, -1), (0, 1), (-1, -1), (-1, 0), (1, -1), (1, 0)],
+          [(0, -1), (0, 1), (-1, 0), (-1, 1), (1, 0), (1, 1)]),
+}
+
+
+class Topology:
+    """Neighbour and critical-mass tables for one board shape and topology.
+
+    ``neighbours`` is a (cells, max_degree) array of flat cell indices
+    (row * cols + col), padded with ``cells``, one past the last cell,
+    where a cell has fewer neighbours than the most connected one. A
+    cell's critical mass is its number of neighbours: 2 to 4 on a grid,
+    always 4 on a torus and up to 6 on a hex board. Build them through
+    get_topology(), which caches one per shape and topology.
+    """
+
+    def __init__(self, rows, cols, kind=GRID):
+        check_board(rows, cols, kind)
+        self.rows = rows
+        self.cols = cols
+        self.kind = kind
+        self.shape = (rows, cols)
+        self.cells = rows * cols
+
+        row, col = np.divmod(np.arange(self.cells), cols)
+        even, odd = (np.array(offsets) for offsets in OFFSETS[kind])
+        offsets = np.where((row % 2 == 1)[:, None, None], odd, even)  # (cells, degree, 2)
+        neighbour_rows = row[:, None] + offsets[..., 0]
+        neighbour_cols = col[:, None] + offsets[..., 1]
+        if kind == TORUS:
+            neighbour_rows %= rows
+            neighbour_cols %= cols
+        inside = ((neighbour_rows >= 0) & (neighbour_rows < rows) &
+                  (neighbour_cols >= 0) & (neighbour_cols < cols))
+        flat = np.where(inside, neighbour_rows * cols + neighbour_cols, self.cells)
+        # Real neighbours first, then the padding
+        order = np.argsort(~inside, axis=1, kind="stable")
+        self.neighbours = np.take_along_axis(flat, order, axis=1).astype(np.intp)
+        self.degree = inside.sum(axis=1).astype(np.int8)
+        self.critical = self.degree.reshape(rows, cols)
+        self.critical_list = self.degree.tolist()  # Flat critical masses for per-cell Python code
+        for table in (self.neighbours, self.degree, self.critical):
+            table.flags.writeable = False
+        # Flat index -> ((row, col, flat), ...), filled in as cells explode; None on big boards, where the
+        # tuples would take far more memory than the neighbour table
+        self.adjacent_cells = {} if self.cells <= ADJACENT_CACHE_CELLS else None
+
+        # (target, source) slices for hits(): cells (row, col) and their neighbours (row + dr, col + dc)
+        self.shifts = []
+        row_step = 2 if kind == HEX else 1  # Hex offsets depend on the row's parity
+        for parity in range(row_step):
+            for dr, dc in OFFSETS[kind][parity]:
+                top, bottom = max(0, -dr), rows - max(0, dr)
+                top += (parity - top) % row_step
+                left, right = max(0, -dc), cols - max(0, dc)
+                self.shifts.append(((Ellipsis, slice(top, bottom, row_step), slice(left, right)),
+                                    (Ellipsis, slice(top + dr, bottom + dr, row_step), slice(left + dc, right + dc))))
+
+    def adjacent(self, row, col):
+        """Return a cell's neighbours as (row, col, flat index) tuples (cached on small boards only)"""
+        cell = row * self.cols + col
+        cache = self.adjacent_cells
+        adjacent = cache.get(cell) if cache is not None else None
+        if adjacent is None:
+            adjacent = tuple((target // self.cols, target % self.cols, target)
+                             for target in self.neighbours[cell, :self.degree[cell]].tolist())
+            if cache is not None:
+                cache[cell] = adjacent
+        return adjacent
+
+    def coordinates(self, cells):
+        """Return the (k, 2) array of (row, col) for flat cell indices"""
+        return np.stack(np.divmod(cells, self.cols), axis=1)
+
+    def spread(self, cells):
+        """Return the sorted flat indices of the neighbours of the given cells and how many of them each one borders"""
+        hits = np.bincount(self.neighbours[cells].ravel(), minlength=self.cells + 1)[:self.cells]
+        targets = np.flatnonzero(hits)
+        return targets, hits[targets].astype(np.int8)
+
+    def hits(self, exploding):
+        """Count, per cell, how many of its neighbours are exploding.
+
+        Works on the last two axes, so a (batch, rows, cols) stack of
+        boards is handled in one go. Each neighbour direction adds one
+        shifted slice of the exploding mask (rolled on a torus), which
+        beats gathering through the neighbour table for anything but the
+        smallest boards.
+        """
+        hits = np.zeros(exploding.shape, dtype=np.int8)
+        if self.kind == TORUS:
+            for dr, dc in OFFSETS[TORUS][0]:
+                hits += np.roll(exploding, (-dr, -dc), axis=(-2, -1))
+            return hits
+        for target, source in self.shifts:
+            hits[target] += exploding[source]
+        return hits
+
+
+def check_board(rows, cols, kind=GRID):
+    """Raise ValueError unless kind is a known topology and a rows x cols board of it is big enough"""
+    if kind not in TOPOLOGIES:
+        raise ValueError(f"unknown topology {kind!r} (expected one of {', '.join(TOPOLOGIES)})")
+    smallest = 3 if kind == TORUS else 2  # Smaller tori would make a cell its own neighbour twice over
+    if rows < smallest or cols < smallest:
+        raise ValueError(f"a {kind} board needs at least {smallest} rows and columns, not {rows}x{cols}")
+
+
+@lru_cache(maxsize=8)
+def get_topology(rows, cols=None, kind=GRID):
+    """Return the (shared, read-only) Topology for a rows x cols board; cols defaults to rows.
+
+    Only the last few shapes stay cached, since a big board's tables take
+    megabytes and a server sees whatever shapes its clients ask for.
+    """
+    return Topology(rows, rows if cols is None else cols, kind)
+
+
+def board_shape(grid_size):
+    """Return (rows, cols) for a grid size given as the side of a square board or a (rows, cols) pair"""
+    return tuple(grid_size) if isinstance(grid_size, (tuple, list)) else (grid_size, grid_size)
+
+
+def parse_size(text):
+    """Parse a board size given as "8" or "12x8" (rows x columns) into (rows, cols)"""
+    rows, _, cols = text.lower().partition("x")
+    return int(rows), int(cols or rows)
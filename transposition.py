@@ -0,0 +1,42 @@
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """Bounded LRU cache from (position hash, row, col) to a resolved move.
+
+    Values are whatever the caller stores - the engine keeps the board
+    after the cascade together with the Cascade record. Every engine
+    sharing a table must use the same cascade settings (elimination stop
+    and budgets), since those change the resolved position.
+    """
+
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return the cached value for key (marking it recently used), or None"""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,885 @@
+"""The pygame view: draws a ChainReactionEngine and turns clicks into moves (run it with atomic_splitter.py)."""
+import pygame
+import sys
+import math
+import os
+import time
+import numpy as np
+from engine import ChainReactionEngine
+from topology import GRID, HEX, board_shape
+from ai import AIWorker
+from particles import ParticlePool
+from sprites import SpriteCache, TextCache
+from camera import Camera
+from playback import CascadePlayback
+from movelog import MoveRecorder
+from profiler import COUNTERS, PHASES, FrameProfiler
+from network import apply_full_state, apply_state, apply_update
+
+# Constants
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 700
+GRID_SIZE = 8  # Default size
+CELL_SIZE = 70
+VIEW_CELLS = 8  # The grid viewport is this many cells wide at full zoom; bigger boards scroll
+MAX_CELL_SIZE = 2 * CELL_SIZE  # Closest zoom
+DETAIL_CELL_SIZE = 16  # Below this cell size, orbs are drawn as flat colored cells
+GRID_LINE_CELL_SIZE = 6  # Below this cell size, grid lines are left out
+PAN_STEP = 0.25  # Arrow keys scroll by this fraction of the viewport
+MARGIN_TOP = 100
+MARGIN_SIDE = 50
+PLAYER_COLORS = [(255, 50, 50, 200), (50, 50, 255, 200)]  # RGBA colors
+BACKGROUND_COLOR = (28, 40, 51)
+GRID_COLOR = (50, 70, 80)
+CELL_COLOR = (40, 60, 70)
+TEXT_COLOR = (220, 220, 220)
+HIGHLIGHT_COLOR = (100, 150, 200, 100)
+ELECTRON_COLOR = (255, 255, 255, 200)
+FPS = 60
+AI_PLAYER = 1  # The AI opponent, when enabled, plays second
+MAX_PARTICLES = 4000  # Hard cap on live particles; extra spawns are dropped
+ELECTRON_STEPS = 60  # Electron positions per revolution; cells repaint only when the step changes
+PROFILE_REFRESH = 10  # Frames between refreshes of the profiler overlay
+MAX_DIRTY_REGIONS = 32  # Above this many changed cells in a frame, their bounding box is repainted at once
+WAVE_PARTICLE_CELLS = 64  # Cells per cascade wave that emit particles; more would only overflow the pool
+
+def electron_step():
+    """Current rotation step of the orbiting electrons (one revolution per ~3 seconds)"""
+    return int(pygame.time.get_ticks() / 500 / (2 * math.pi) * ELECTRON_STEPS) % ELECTRON_STEPS
+
+class Orb:
+    """Pop-in animation state of a cell whose orb is still growing; owner and count live on the Board"""
+    def __init__(self, animation_progress=0):
+        self.animation_progress = animation_progress
+        
+    def update(self):
+        # Update animation
+        if self.animation_progress < 1:
+            self.animation_progress = min(1, self.animation_progress + 0.1)
+
+def draw_orb(surface, sprites, x, y, player, count, animation_progress=1, scale=1):
+    """Draw a cell's orb and its electrons centered on (x, y), scaled with the zoom"""
+    # Calculate animated size
+    anim_size = animation_progress * 15 * scale
+    orbit = 20 * animation_progress * scale
+    
+    # Draw the orb
+    sprites.draw_circle(surface, x, y, PLAYER_COLORS[player-1], int(anim_size))
+    
+    # Draw electrons based on count: one in the middle, the rest orbiting
+    if count >= 1:
+        draw_electron(surface, sprites, x, y, int(8 * scale))
+    angle = electron_step() * 2 * math.pi / ELECTRON_STEPS  # Rotating animation
+    # A third of a turn apart, spread evenly when more fit on the orbit (hex cells hold up to 5 orbs)
+    spacing = 2 * math.pi / max(3, count - 1)
+    for electron in range(count - 1):
+        electron_angle = angle + electron * spacing
+        draw_electron(surface, sprites, x + math.cos(electron_angle) * orbit, y + math.sin(electron_angle) * orbit,
+                      int(6 * scale))
+
+def draw_electron(surface, sprites, x, y, size):
+    sprites.draw_circle(surface, x, y, ELECTRON_COLOR, size, ELECTRON_COLOR[3])
+
+class ChainReactionGame:
+    def __init__(self, player1_name="Player 1", player2_name="Player 2", grid_size=8, timer=60, ai_player=None,
+                 record_dir=None, client=None, profiler=None, topology=GRID):
+        pygame.init()  # Here rather than at import, so nothing but the view ever starts SDL
+        self.player_names = [player1_name, player2_name]
+        self.grid_size = grid_size  # Side of a square board or (rows, cols)
+        self.rows, self.cols = board_shape(grid_size)
+        self.topology = topology
+        self.timer = timer
+        # Optional search bot playing AI_PLAYER; it thinks in a background process
+        self.ai_player = ai_player
+        self.ai_worker = AIWorker(ai_player) if ai_player is not None else None
+        # Every match is archived as a binary move log when record_dir is set (see movelog.py)
+        self.record_dir = record_dir
+        # Networked mode: the server runs the rules and clocks; the local engine only mirrors it
+        self.client = client
+        self.net_player = None  # Our player number once the server has started the match
+        self.net_timers = None  # (timers_ms, ticks when received) for the local countdown
+        self.status = None  # Connection status shown in the panel
+        # Per-phase frame timings; F3 toggles them and their overlay
+        self.profiler = profiler or FrameProfiler()
+        self.profile_surface = None
+        self.engine = None
+        self.playback = None  # CascadePlayback of the last move's chain reaction while it is on screen
+        self.playback_tick = 0
+        self.animations = {}  # (row, col) -> Orb, only for cells still popping in
+        self.hovered_cell = None
+        self.particles = ParticlePool(MAX_PARTICLES)  # Explosion and capture particles, colored by player
+        self.sprites = SpriteCache()  # Pre-rendered orb, electron and particle circles
+        self.text = TextCache()  # Rendered labels, so fonts rasterize each string once
+        
+        # Initialize screen
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption(f"Chain Reaction: {player1_name} vs {player2_name}")
+        self.clock = pygame.time.Clock()
+        
+        # Load fonts
+        self.font_large = pygame.font.SysFont("Arial", 32)
+        self.font_medium = pygame.font.SysFont("Arial", 24)
+        self.font_small = pygame.font.SysFont("Courier New", 14)
+        
+        # Zoomable, scrollable view of the grid; boards up to VIEW_CELLS wide fit at full size.
+        # Hex boards are drawn as bricks, odd rows shifted half a cell right
+        stagger = topology == HEX
+        view_width = int(min(self.cols + (0.5 if stagger else 0), VIEW_CELLS) * CELL_SIZE)
+        view_height = min(self.rows, VIEW_CELLS) * CELL_SIZE
+        self.camera = Camera(self.rows, self.cols, (MARGIN_SIDE, MARGIN_TOP, view_width, view_height),
+                             MAX_CELL_SIZE, stagger)
+        
+        # Dirty-rectangle rendering: static scene cached, only changed regions redrawn
+        self.panel_rect = pygame.Rect(MARGIN_SIDE + view_width, 0,
+                                      SCREEN_WIDTH - (MARGIN_SIDE + view_width), SCREEN_HEIGHT)
+        self.background = self.build_background()
+        self.highlight_surface = self.build_highlight()
+        self.profile_rect = pygame.Rect(self.panel_rect.x + 10, SCREEN_HEIGHT - 250, self.panel_rect.width - 20, 240)
+        self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.overlay.fill((0, 0, 0, 180))
+        self.panel_surface = None  # Panel with its dynamic text, rebuilt when panel_state changes
+        self.panel_surface_state = None
+        self.dirty_cells = set()  # Cells to repaint on the next frame
+        self.full_redraw = True
+        self.drawn_game_over = False
+        self.drawn_hover = None
+        self.drawn_panel = None
+        self.particle_rect = None  # Screen area covered by particles in the last drawn frame
+        self.electron_step = electron_step()
+        self.new_game()
+
+    def new_game(self):
+        """Start a fresh game in the same window"""
+        if self.ai_worker is not None:
+            self.ai_worker.cancel()
+        self.close_recorder()
+        # All rules live in the headless engine; this class only animates and draws it.
+        # Cascades resolve instantly and are then played back wave by wave (see playback.py)
+        self.engine = ChainReactionEngine(self.grid_size, self.timer, clock=pygame.time.get_ticks, instant=True,
+                                          topology=self.topology)
+        if self.client is not None:
+            self.net_player = None
+            self.net_timers = None
+            self.status = "Waiting for an opponent..."
+            self.client.join(self.player_names[0], self.grid_size, self.timer, topology=self.topology)
+        if self.record_dir is not None:
+            path = os.path.join(self.record_dir, time.strftime("match-%Y%m%d-%H%M%S.aslog"))
+            self.engine.recorder = MoveRecorder(path, self.engine)
+        self.reset_view()
+
+    def reset_view(self):
+        """Drop running animations and repaint everything, after the board jumped to another position"""
+        self.playback = None
+        self.animations.clear()
+        self.particles.clear()
+        self.dirty_cells.clear()
+        self.full_redraw = True
+
+    @property
+    def board(self):
+        """The position on screen: mid-cascade during playback, the engine's board otherwise"""
+        return self.playback.board if self.playback is not None else self.engine.board
+
+    def close_recorder(self):
+        if self.engine is not None and self.engine.recorder is not None:
+            self.engine.recorder.close(self.engine)
+            self.engine.recorder = None
+
+    def undo(self):
+        """Take back the last move; against the AI, take back its reply too"""
+        if self.client is not None or not self.engine.undo():
+            return False
+        if self.ai_worker is not None:
+            self.ai_worker.cancel()
+            if self.engine.current_player == AI_PLAYER:
+                self.engine.undo()
+        self.reset_view()
+        return True
+
+    def redo(self):
+        """Replay a taken-back move; against the AI, also its reply"""
+        if self.client is not None or not self.engine.redo():
+            return False
+        if self.ai_worker is not None:
+            self.ai_worker.cancel()
+            if self.engine.current_player == AI_PLAYER:
+                self.engine.redo()
+        self.reset_view()
+        return True
+    
+    def update(self):
+        """Update the game state, animations, chain reactions, etc."""
+        profiler = self.profiler
+        if self.client is not None:
+            # The server keeps the clocks and resolves moves
+            self.update_network()
+        elif self.playback is None:
+            # Update timers (paused while a chain reaction plays on screen)
+            self.engine.update_timers()
+        profiler.mark("timers")
+        
+        # Play the waves of the current chain reaction that are due
+        self.update_playback()
+        profiler.mark("explosions")
+
+        # Let the AI move once the board has settled on its turn
+        if self.ai_worker is not None:
+            self.update_ai()
+            profiler.mark("ai")
+        
+        # Update popping-in orbs, dropping them from the active set once fully grown
+        for cell, orb in list(self.animations.items()):
+            self.dirty_cells.add(cell)
+            orb.update()
+            if orb.animation_progress >= 1:
+                del self.animations[cell]
+        
+        # Rotating electrons only need repainting in visible cells drawn in detail
+        rotated = self.electron_step != electron_step()
+        self.electron_step = electron_step()
+        if rotated and self.camera.cell_size >= DETAIL_CELL_SIZE:
+            rows, cols = self.camera.visible_cells()
+            window = self.board.count[rows.start:rows.stop, cols.start:cols.stop]
+            self.dirty_cells.update((row + rows.start, col + cols.start)
+                                    for row, col in np.argwhere(window >= 2).tolist())
+        profiler.mark("orbs")
+        
+        # Update particles
+        self.particles.update()
+        profiler.mark("particles")
+
+    def update_ai(self):
+        """Ask the AI for a move on its turn and play it when it's ready"""
+        engine = self.engine
+        if engine.game_over or self.playback is not None or engine.current_player != AI_PLAYER:
+            return
+        move = self.ai_worker.poll()
+        if move is not None:
+            self.make_move(*move)
+        else:
+            self.ai_worker.request_move(engine.board, AI_PLAYER, engine.move_count,
+                                        engine.player_timers[AI_PLAYER], self.topology)
+
+    def update_network(self):
+        """Apply messages from the server and count down the clock"""
+        engine = self.engine
+        for message in self.client.poll():
+            kind = message["type"]
+            if kind == "start":
+                self.net_player = message["player"]
+                self.player_names = message["names"]
+                self.net_timers = (message["timers_ms"], pygame.time.get_ticks())
+                self.status = None
+                self.background = self.build_background()
+                self.panel_surface = None
+                self.full_redraw = True
+            elif kind == "update":
+                self.status = None  # A move went through, so any refusal shown is stale
+                self.mirror_update(message)
+            elif kind == "state":
+                apply_full_state(engine, message)
+                self.net_timers = (message["state"]["timers_ms"], pygame.time.get_ticks())
+                self.reset_view()
+            elif kind == "end":
+                apply_state(engine, message["state"])
+                self.net_timers = None
+            elif kind == "error":
+                # A refused move ("not your turn", "illegal move", ...) would otherwise do nothing on screen
+                self.status = f"Server: {message['message']}"
+        if self.client.closed and not engine.game_over:
+            self.status = "Disconnected from server"
+
+        # Local countdown between server updates; the server decides when time is up
+        if self.net_timers is not None and not engine.game_over:
+            timers_ms, received = self.net_timers
+            player = engine.current_player
+            left = timers_ms[player] - (pygame.time.get_ticks() - received)
+            engine.player_timers[player] = max(0, math.ceil(left / 1000))
+
+    def mirror_update(self, message):
+        """Mirror a move resolved by the server and animate the cells it changed"""
+        engine = self.engine
+        if self.playback is not None:
+            self.finish_playback()
+        cells = message["cells"]
+        before = engine.board.owner.flat[cells].tolist()
+        row, col = message["move"]
+        player = message["player"]
+        occupied = engine.board.count[row, col] > 0
+        waves = message.get("waves", 0)  # Cascade length; the waves are re-exploded locally
+        board = engine.board.copy() if waves else None
+        if not apply_update(engine, message):
+            self.client.sync()  # Out of step with the server: fetch the whole board
+            waves = 0
+        self.net_timers = (message["state"]["timers_ms"], pygame.time.get_ticks())
+
+        if waves:
+            # Replay the cascade from the position the server resolved it on
+            board.add_orb(row, col, player + 1)
+            self.start_playback(board, player, waves)
+            return
+        for cell, previous, owner, count in zip(cells, before, message["owners"], message["counts"]):
+            cell = divmod(cell, self.cols)
+            if count == 0:
+                self.animations.pop(cell, None)
+            elif previous == 0:
+                self.animations[cell] = Orb()
+            elif previous != owner:
+                self.animations[cell] = Orb(0.5)
+            self.dirty_cells.add(cell)
+        if occupied:
+            self.emit_particles(row, col, player, 5)
+
+    def cell_center(self, row, col):
+        """Return screen coordinates of a cell's center"""
+        return self.camera.cell_center(row, col)
+
+    def emit_particles(self, row, col, color, count, max_size=5):
+        """Spawn particles at a cell's center, unless the cell is scrolled out of view"""
+        if self.camera.is_visible(row, col):
+            x, y = self.cell_center(row, col)
+            self.particles.emit(x, y, color, count, max_size)
+
+    def start_playback(self, board, player, wave_count):
+        """Show the cascade the engine just resolved, starting from board (the position before its first wave)"""
+        self.playback = CascadePlayback(board, player + 1, self.engine.topology, wave_count, self.engine.board)
+        self.playback_tick = pygame.time.get_ticks()
+        self.update_playback()  # The first wave goes off right away
+
+    def update_playback(self):
+        """Play the waves of the current cascade that are due by now"""
+        playback = self.playback
+        if playback is None:
+            return
+        now = pygame.time.get_ticks()
+        waves = playback.advance(now - self.playback_tick)
+        self.playback_tick = now
+        for wave in waves:
+            self.animate_wave(playback.owner, wave)
+        if waves:
+            # Cells emptied again by a later wave have nothing left to animate
+            board = playback.board
+            for cell in [cell for cell in self.animations if board.count[cell] == 0]:
+                del self.animations[cell]
+        if playback.done:
+            self.finish_playback()
+
+    def finish_playback(self):
+        """Jump to the end of the cascade on screen (also how a click or Space skips it)"""
+        for cell in self.playback.finish().tolist():
+            cell = divmod(cell, self.cols)
+            self.dirty_cells.add(cell)
+            if self.engine.board.count[cell] == 0:
+                self.animations.pop(cell, None)
+        self.playback = None
+        if self.client is None:
+            self.engine.start_turn_clock()  # The next player's clock starts once the cascade has played out
+
+    def animate_wave(self, player, wave):
+        """Start the particles and pop-ins of one cascade wave, for the cells in view"""
+        self.profiler.count("exploded", len(wave.exploded))
+        rows, cols = self.camera.visible_cells()
+
+        def in_view(cells):
+            return ((cells[:, 0] >= rows.start) & (cells[:, 0] < rows.stop) &
+                    (cells[:, 1] >= cols.start) & (cells[:, 1] < cols.stop))
+
+        # Create explosion particles
+        topology = self.engine.topology
+        exploded = topology.coordinates(wave.exploded)
+        shown = in_view(exploded)
+        emitters = WAVE_PARTICLE_CELLS
+        for (row, col), count in zip(exploded[shown].tolist(), wave.counts[shown].tolist()):
+            self.animations.pop((row, col), None)
+            self.dirty_cells.add((row, col))
+            if emitters > 0:
+                self.emit_particles(row, col, player - 1, count * 8, 7)
+                emitters -= 1
+
+        targets = topology.coordinates(wave.targets)
+        shown = in_view(targets)
+        for (row, col), previous_owner in zip(targets[shown].tolist(), wave.previous_owner[shown].tolist()):
+            if previous_owner == 0:
+                self.animations[row, col] = Orb()
+            else:
+                if previous_owner != player:
+                    self.animations[row, col] = Orb(0.5)  # Start with some animation progress for smoother visuals
+                # Add some visual particles
+                if emitters > 0:
+                    self.emit_particles(row, col, player - 1, 3)
+                    emitters -= 1
+            self.dirty_cells.add((row, col))
+
+    def make_move(self, row, col):
+        """Place an orb through the engine and animate it"""
+        engine = self.engine
+        player = engine.current_player
+        occupied = engine.board.count[row, col] > 0
+        before = engine.board.copy()  # The engine resolves any chain reaction in place
+        if not engine.make_move(row, col):
+            return False
+
+        if engine.last_cascade:
+            before.add_orb(row, col, player + 1)
+            self.start_playback(before, player, len(engine.last_cascade))
+        elif occupied:
+            # Create particle effect when adding to existing orb
+            self.emit_particles(row, col, player, 5)
+        else:
+            self.animations[row, col] = Orb()
+        self.dirty_cells.add((row, col))
+        return True
+
+    def camera_moved(self, dx=0, dy=0, zoomed=False):
+        """Rebuild the view after a pan by (dx, dy) screen pixels or a zoom"""
+        if zoomed:
+            self.particles.clear()
+            self.highlight_surface = self.build_highlight()
+        else:
+            self.particles.shift(-dx, -dy)
+        self.background = self.build_background()
+        self.full_redraw = True
+
+    def pan(self, dx, dy):
+        dx, dy = self.camera.pan(dx, dy)
+        if dx or dy:
+            self.camera_moved(dx, dy)
+
+    def zoom(self, steps, pos=None):
+        if self.camera.zoom(steps, pos):
+            self.camera_moved(zoomed=True)
+    
+    def build_background(self):
+        """Render the parts of the scene that never change onto a background surface"""
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        background.fill(BACKGROUND_COLOR)
+        
+        # Draw the visible part of the grid background
+        camera = self.camera
+        grid_rect = camera.grid_rect()
+        rows, cols = camera.visible_cells()
+        if camera.stagger:
+            # Brick layout: fill row by row, leaving the half-cell notches at the ends empty
+            for row in rows:
+                pygame.draw.rect(background, CELL_COLOR, self.row_rect(row).clip(camera.viewport))
+        else:
+            pygame.draw.rect(background, CELL_COLOR, grid_rect)
+        
+        # Draw grid lines around the visible cells, thinner when zoomed out
+        if camera.cell_size >= GRID_LINE_CELL_SIZE and camera.stagger:
+            width = 2 if camera.cell_size >= DETAIL_CELL_SIZE else 1
+            background.set_clip(grid_rect.inflate(4, 4))
+            for row in rows:
+                band = self.row_rect(row)
+                # Top and bottom edges, then the cell borders, which move half a cell on every other row
+                pygame.draw.line(background, GRID_COLOR, band.topleft, band.topright, width)
+                pygame.draw.line(background, GRID_COLOR, band.bottomleft, band.bottomright, width)
+                for col in range(cols.start, cols.stop + 1):
+                    x = camera.cell_rect(row, col).x
+                    pygame.draw.line(background, GRID_COLOR, (x, band.top), (x, band.bottom), width)
+            background.set_clip(None)
+        elif camera.cell_size >= GRID_LINE_CELL_SIZE:
+            width = 2 if camera.cell_size >= DETAIL_CELL_SIZE else 1
+            background.set_clip(grid_rect.inflate(4, 4))
+            for row in range(rows.start, rows.stop + 1):
+                # Horizontal lines
+                y = camera.cell_rect(row, 0).y
+                pygame.draw.line(background, GRID_COLOR, (grid_rect.left, y), (grid_rect.right, y), width)
+            for col in range(cols.start, cols.stop + 1):
+                # Vertical lines
+                x = camera.cell_rect(0, col).x
+                pygame.draw.line(background, GRID_COLOR, (x, grid_rect.top), (x, grid_rect.bottom), width)
+            background.set_clip(None)
+        
+        # Draw right panel background and the static player info
+        pygame.draw.rect(background, (40, 50, 60), self.panel_rect)
+        for i in range(2):
+            self.draw_player_badge(background, i, 50 + i * 100)
+        turn_surface = self.text.render(self.font_medium, "Current Turn:", TEXT_COLOR)
+        background.blit(turn_surface, (self.panel_rect.x + 20, 220))
+        return background
+
+    def build_highlight(self):
+        size = self.camera.cell_size
+        highlight = pygame.Surface((size, size), pygame.SRCALPHA)
+        highlight.fill(HIGHLIGHT_COLOR)
+        return highlight
+
+    def cell_rect(self, row, col):
+        return self.camera.cell_rect(row, col)
+
+    def row_rect(self, row):
+        """Screen area of a whole board row, unclipped"""
+        return self.cell_rect(row, 0).union(self.cell_rect(row, self.cols - 1))
+
+    def game_over_shown(self):
+        """Whether to show the result: the game is over and its last cascade has played out"""
+        return self.engine.game_over and self.playback is None
+
+    def panel_state(self):
+        """Everything the dynamic part of the panel depends on"""
+        engine = self.engine
+        return (tuple(engine.player_timers), engine.current_player, self.playback is not None, self.status)
+
+    def dirty_rects(self):
+        """Collect the screen regions that changed since the last drawn frame"""
+        game_over = self.game_over_shown()
+        hover = self.hovered_cell if not game_over and self.playback is None else None
+        if self.full_redraw or game_over != self.drawn_game_over:
+            self.full_redraw = False
+            self.drawn_game_over = game_over
+            self.dirty_cells.clear()
+            self.drawn_hover = hover
+            self.drawn_panel = self.panel_state()
+            self.particle_rect = self.particles_bounds()
+            return [self.screen.get_rect()]
+
+        if hover != self.drawn_hover:
+            self.dirty_cells.update(cell for cell in (hover, self.drawn_hover) if cell is not None)
+            self.drawn_hover = hover
+        # Cells scrolled out of view are skipped; the next pan redraws everything anyway
+        viewport = self.camera.viewport
+        rects = [rect for rect in (self.cell_rect(row, col).clip(viewport) for row, col in self.dirty_cells)
+                 if rect.width and rect.height]
+        self.dirty_cells.clear()
+        if len(rects) > MAX_DIRTY_REGIONS:
+            rects = [rects[0].unionall(rects)]
+
+        # Particles: erase where they were and draw where they are now
+        particle_rect = self.particles_bounds()
+        if particle_rect is not None and self.particle_rect is not None:
+            area = particle_rect.union(self.particle_rect)
+        else:
+            area = particle_rect if particle_rect is not None else self.particle_rect
+        if area is not None:
+            # Cells under the particles join their region, so the particles are drawn once per frame
+            overlapping = [rect for rect in rects if rect.colliderect(area)]
+            rects = [rect for rect in rects if not rect.colliderect(area)]
+            rects.append(area.unionall(overlapping))
+        self.particle_rect = particle_rect
+
+        panel = self.panel_state()
+        if panel != self.drawn_panel:
+            rects.append(self.panel_rect)
+            self.drawn_panel = panel
+
+        if self.profiler.enabled and self.profiler.frame % PROFILE_REFRESH == 0:
+            self.profile_surface = self.build_profile()
+            rects.append(self.profile_rect)
+        return rects
+
+    def particles_bounds(self):
+        bounds = self.particles.bounds()
+        if bounds is None:
+            return None
+        left, top, right, bottom = bounds
+        rect = pygame.Rect(left, top, right - left, bottom - top).clip(self.screen.get_rect())
+        # Particles entirely off screen (e.g. panned away) leave nothing to erase or draw
+        return rect if rect.width and rect.height else None
+
+    def draw(self):
+        """Redraw the regions that changed and push only those to the display.
+
+        Returns False (and touches nothing) when the scene is idle.
+        """
+        rects = self.dirty_rects()
+        if not rects:
+            self.profiler.mark("draw")
+            return False
+        for rect in rects:
+            self.draw_region(rect)
+        self.profiler.count("regions", len(rects))
+        self.profiler.mark("draw")
+        pygame.display.update(rects)
+        self.profiler.mark("flip")
+        return True
+
+    def draw_region(self, rect):
+        """Repaint one screen region from the background up, clipped to it"""
+        screen = self.screen
+        screen.set_clip(rect)
+        screen.blit(self.background, rect, rect)
+        
+        # Grid contents are culled to the visible cells touching the region
+        grid_clip = rect.clip(self.camera.viewport)
+        if grid_clip.width and grid_clip.height:
+            screen.set_clip(grid_clip)
+            
+            # Highlight hovered cell
+            if self.drawn_hover is not None:
+                highlight_rect = self.cell_rect(*self.drawn_hover)
+                if highlight_rect.colliderect(grid_clip):
+                    screen.blit(self.highlight_surface, highlight_rect)
+            
+            rows, cols = self.camera.visible_cells(grid_clip)
+            if self.camera.cell_size >= DETAIL_CELL_SIZE:
+                self.draw_orbs(rows, cols)
+            else:
+                self.draw_cells(rows, cols)
+            screen.set_clip(rect)
+        
+        # Draw particles
+        if self.particle_rect is not None and self.particle_rect.colliderect(rect):
+            self.particles.draw(screen, PLAYER_COLORS, self.sprites)
+        
+        # Draw UI (the panel covers any particles that flew over it)
+        if self.panel_rect.colliderect(rect):
+            self.draw_ui()
+        
+        # Draw the frame profiler overlay
+        if self.profiler.enabled and self.profile_surface is not None and self.profile_rect.colliderect(rect):
+            screen.blit(self.profile_surface, self.profile_rect)
+        
+        # Draw game over overlay if needed
+        if self.drawn_game_over:
+            self.draw_game_over()
+        screen.set_clip(None)
+    
+    def draw_orbs(self, rows, cols):
+        """Draw the orbs of the occupied cells in a block of the board"""
+        board = self.board
+        scale = self.camera.cell_size / CELL_SIZE
+        window = board.count[rows.start:rows.stop, cols.start:cols.stop]
+        for row, col in np.argwhere(window).tolist():
+            row += rows.start
+            col += cols.start
+            orb = self.animations.get((row, col))
+            x, y = self.cell_center(row, col)
+            draw_orb(self.screen, self.sprites, x, y, int(board.owner[row, col]), int(board.count[row, col]),
+                     orb.animation_progress if orb is not None else 1, scale)
+
+    def draw_cells(self, rows, cols):
+        """Zoomed-out drawing: a block of the board as flat cells colored by owner, brighter with more orbs"""
+        board = self.board
+        owner = board.owner[rows.start:rows.stop, cols.start:cols.stop]
+        count = board.count[rows.start:rows.stop, cols.start:cols.stop]
+        if not owner.any():
+            return
+        palette = np.array([(0, 0, 0)] + [color[:3] for color in PLAYER_COLORS], dtype=np.float32)
+        shade = 0.55 + 0.15 * np.minimum(count, 3)
+        pixels = (palette[owner] * shade[..., None]).astype(np.uint8)
+        pixels[owner == 0] = 0  # Colorkey: empty cells show the grid underneath
+        camera = self.camera
+        size = camera.cell_size
+        width = len(cols) * size
+        if camera.stagger:
+            # Brick layout: two image columns per cell, with odd rows starting one column later
+            odd = np.arange(rows.start, rows.stop) % 2 == 1
+            bricks = np.zeros((len(rows), 2 * len(cols) + 1, 3), dtype=np.uint8)
+            for shift, selected in ((0, ~odd), (1, odd)):
+                for half in range(2):
+                    bricks[selected, shift + half:shift + half + 2 * len(cols):2] = pixels[selected]
+            pixels = bricks
+            width += size // 2
+        image = pygame.surfarray.make_surface(pixels.transpose(1, 0, 2))
+        image.set_colorkey((0, 0, 0))
+        image = pygame.transform.scale(image, (width, len(rows) * size))
+        rect = self.cell_rect(rows.start, cols.start)
+        self.screen.blit(image, (rect.x - camera.row_shift(rows.start), rect.y))
+
+    def draw_ui(self):
+        """Blit the panel, rebuilding it only when a timer or the game status changed"""
+        state = self.panel_state()
+        if self.panel_surface is None or state != self.panel_surface_state:
+            self.panel_surface = self.build_panel()
+            self.panel_surface_state = state
+        self.screen.blit(self.panel_surface, self.panel_rect)
+
+    def build_panel(self):
+        """Render the panel background plus timers and game status onto a surface"""
+        panel_rect = self.panel_rect
+        panel = self.background.subsurface(panel_rect).copy()
+        
+        # Draw player timers
+        for i in range(2):
+            timer_text = f"Time: {self.engine.player_timers[i]}s"
+            timer_surface = self.text.render(self.font_medium, timer_text, TEXT_COLOR)
+            panel.blit(timer_surface, (60, 50 + i * 100 + 25))
+        
+        # Draw current turn indicator
+        player_name = self.player_names[self.engine.current_player]
+        name_surface = self.text.render(self.font_large, player_name, PLAYER_COLORS[self.engine.current_player][:3])
+        panel.blit(name_surface, (20, 250))
+        
+        # Draw timers
+        timer_text = f"Time Left: {self.engine.player_timers[self.engine.current_player]}s"
+        timer_surface = self.text.render(self.font_medium, timer_text, TEXT_COLOR)
+        panel.blit(timer_surface, (20, 300))
+        
+        # Draw chain reaction indicator
+        if self.playback is not None:
+            chain_text = "Chain Reaction in Progress..."
+            chain_surface = self.text.render(self.font_medium, chain_text, (255, 200, 0))
+            panel.blit(chain_surface, (20, 350))
+        
+        # Draw network status
+        if self.status is not None:
+            status_surface = self.text.render(self.font_medium, self.status, (255, 200, 0))
+            panel.blit(status_surface, (20, 400))
+        return panel
+    
+    def build_profile(self):
+        """Render rolling p50/p99 frame timings (ms) and per-frame counts onto the overlay surface"""
+        surface = pygame.Surface(self.profile_rect.size, pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 200))
+        stats = self.profiler.percentiles()
+        lines = [f"{'':15}{'p50':>7}{'p99':>7}"]
+        for name in ("frame",) + PHASES + COUNTERS:
+            if name in stats:
+                p50, p99 = stats[name]
+                lines.append(f"{name:15}{p50:7.2f}{p99:7.2f}" if name not in COUNTERS else
+                             f"{name:15}{p50:7.0f}{p99:7.0f}")
+        for i, line in enumerate(lines):
+            # Numbers change on every refresh, so these skip the TextCache
+            surface.blit(self.font_small.render(line, True, TEXT_COLOR), (6, 4 + i * 15))
+        return surface
+
+    def toggle_profiler(self):
+        self.profiler.toggle()
+        self.full_redraw = True  # Show or erase the overlay
+
+    def draw_player_badge(self, surface, player_num, y_pos):
+        """Draw player color indicator and name"""
+        panel_x = self.panel_rect.x + 20
+        
+        # Draw player color indicator
+        pygame.draw.rect(surface, PLAYER_COLORS[player_num][:3], 
+                        (panel_x, y_pos, 30, 30), border_radius=15)
+        pygame.draw.rect(surface, TEXT_COLOR, 
+                        (panel_x, y_pos, 30, 30), 2, border_radius=15)
+        
+        # Draw player name
+        name_surface = self.text.render(self.font_medium, self.player_names[player_num], TEXT_COLOR)
+        surface.blit(name_surface, (panel_x + 40, y_pos))
+    
+    def draw_game_over(self):
+        """Draw game over overlay"""
+        self.screen.blit(self.overlay, (0, 0))
+        
+        if self.engine.winner is not None:
+            # Winner announcement
+            winner_text = f"{self.player_names[self.engine.winner]} Wins!"
+            winner_surface = self.text.render(self.font_large, winner_text, PLAYER_COLORS[self.engine.winner][:3])
+            winner_rect = winner_surface.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 30))
+            self.screen.blit(winner_surface, winner_rect)
+        else:
+            # Draw announcement
+            draw_text = "Game Ended in Draw!"
+            draw_surface = self.text.render(self.font_large, draw_text, TEXT_COLOR)
+            draw_rect = draw_surface.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 30))
+            self.screen.blit(draw_surface, draw_rect)
+        
+        # Play again prompt
+        again_text = "Click anywhere to play again"
+        again_surface = self.text.render(self.font_medium, again_text, TEXT_COLOR)
+        again_rect = again_surface.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 30))
+        self.screen.blit(again_surface, again_rect)
+    
+    def handle_click(self, pos):
+        """Handle mouse click"""
+        # A click during a chain reaction skips to its end
+        if self.playback is not None:
+            self.finish_playback()
+            return True
+        
+        # Check if click is in grid
+        cell = self.camera.cell_at(pos)
+        if cell is not None:
+            row, col = cell
+            if self.ai_worker is not None and self.engine.current_player == AI_PLAYER:
+                return False  # Wait for the AI's move
+            if self.client is not None:
+                return self.send_move(row, col)
+            return self.make_move(row, col)
+        
+        # If game over, any click resets
+        elif self.engine.game_over:
+            self.new_game()
+            return True
+            
+        return False
+    
+    def send_move(self, row, col):
+        """Networked mode: ask the server to play our move; the board changes when it answers"""
+        engine = self.engine
+        if self.net_player != engine.current_player or engine.game_over or not engine.is_valid_move(row, col):
+            return False
+        self.client.move(row, col)
+        return True
+
+    def handle_key(self, key):
+        """Arrow keys scroll, +/- zoom, Home shows the whole board, Z/Y undo and redo, Space skips a cascade"""
+        step_x = int(self.camera.viewport.width * PAN_STEP)
+        step_y = int(self.camera.viewport.height * PAN_STEP)
+        pans = {pygame.K_LEFT: (-step_x, 0), pygame.K_RIGHT: (step_x, 0),
+                pygame.K_UP: (0, -step_y), pygame.K_DOWN: (0, step_y)}
+        if key in pans:
+            self.pan(*pans[key])
+        elif key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            self.zoom(1)
+        elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.zoom(-1)
+        elif key == pygame.K_HOME and self.camera.fit():
+            self.camera_moved(zoomed=True)
+        elif key == pygame.K_SPACE and self.playback is not None:
+            self.finish_playback()
+        elif key == pygame.K_F3:
+            self.toggle_profiler()
+        elif key == pygame.K_z:
+            self.undo()
+        elif key == pygame.K_y:
+            self.redo()
+    
+    def end_profile_frame(self):
+        """Add the frame's particle and sprite blit counts and close the profiler frame"""
+        profiler = self.profiler
+        if profiler.enabled:
+            profiler.count("live_particles", len(self.particles))
+            profiler.count("blits", self.sprites.blits)
+            profiler.end_frame()
+        self.sprites.blits = 0
+
+    def run(self):
+        """Main game loop"""
+        running = True
+        profiler = self.profiler
+        while running:
+            profiler.start_frame()
+            mouse_pos = pygame.mouse.get_pos()
+            
+            # Update hovered cell
+            self.hovered_cell = None
+            if self.playback is None:  # Don't highlight during chain reactions
+                self.hovered_cell = self.camera.cell_at(mouse_pos)
+            
+            # Process events: left click plays, wheel zooms, right/middle drag and arrow keys scroll
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    self.handle_click(event.pos)
+                elif event.type == pygame.MOUSEWHEEL:
+                    self.zoom(event.y, mouse_pos)
+                elif event.type == pygame.MOUSEMOTION and (event.buttons[1] or event.buttons[2]):
+                    self.pan(-event.rel[0], -event.rel[1])
+                elif event.type == pygame.KEYDOWN:
+                    self.handle_key(event.key)
+            profiler.mark("events")
+            
+            # Update game state
+            self.update()
+            
+            # Drawing (skipped when nothing on screen changed)
+            self.draw()
+            self.clock.tick(FPS)
+            profiler.mark("wait")
+            self.end_profile_frame()
+        
+        if self.ai_worker is not None:
+            self.ai_worker.shutdown(wait=True)
+        self.close_recorder()
+        if self.client is not None:
+            self.client.close()
+        profiler.close()
+        pygame.quit()
+        sys.exit()